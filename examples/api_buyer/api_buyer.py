@@ -2,32 +2,36 @@
 Example FastAPI wrapper for the buyer agent.
 """
 
+import asyncio
 import datetime
+import hashlib
 import logging
+import re
+import threading
 import uuid
+from collections import OrderedDict
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
-
-# from builtins import anext
+from dataclasses import dataclass, field
 from os import getenv
 from pathlib import Path
-from typing import List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
+import httpx
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pgvector.sqlalchemy import Vector
+from openai import AsyncOpenAI
 from pydantic import BaseModel, Field
-from sqlalchemy import Column, String, Text, create_engine
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.sql import text
 
 from agno.agent import Agent
 from agno.knowledge.embedder.openai import OpenAIEmbedder
 from agno.knowledge.knowledge import Knowledge
 from agno.models.openai import OpenAIChat
-from agno.vectordb.pgvector import PgVector, SearchType
+from agno.vectordb.pgvector import HNSW, PgVector, SearchType
 from synvya_sdk import KeyEncoding, NostrKeys, Profile, generate_keys
 from synvya_sdk.agno import BuyerTools
 
@@ -35,48 +39,115 @@ from synvya_sdk.agno import BuyerTools
 # Add the filter code here
 class EndpointFilter(logging.Filter):
     def __init__(self, path: str) -> None:
+        super().__init__()
         self.path = path
 
     def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn access records carry (client, method, path, version, status)
+        # as args; compare those instead of formatting every request's message
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3:
+            return not (args[1] == "GET" and args[2] == self.path)
         return record.getMessage().find(f"GET {self.path}") == -1
 
 
 # Configure the filter
 logging.getLogger("uvicorn.access").addFilter(EndpointFilter("/health"))
 
-# Set logging to WARN level to suppress INFO logs
-logging.basicConfig(level=logging.WARN)
 
+@dataclass
+class CachedOpenAIEmbedder(OpenAIEmbedder):
+    """
+    OpenAIEmbedder that remembers the embeddings of recent texts.
+    Knowledge base searches embed the query on every call, and visitors
+    ask the same questions over and over.
+    """
+
+    cache_size: int = 4096
+    _cache: "OrderedDict[str, List[float]]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    # PgVector searches from worker threads, so guard the shared cache
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
 
-# Load environment variables from .env
-script_dir = Path(__file__).parent
-load_dotenv(script_dir / ".env")
+    def _lookup(self, text: str) -> Tuple[str, Optional[List[float]]]:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+        return key, embedding
+
+    def _store(self, key: str, embedding: List[float]) -> None:
+        # failed requests return an empty embedding, don't remember those
+        if embedding:
+            with self._lock:
+                self._cache[key] = embedding
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    def get_embedding(self, text: str) -> List[float]:
+        key, embedding = self._lookup(text)
+        if embedding is None:
+            embedding = super().get_embedding(text)
+            self._store(key, embedding)
+        return embedding
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        key, embedding = self._lookup(text)
+        if embedding is None:
+            embedding = await super().async_get_embedding(text)
+            self._store(key, embedding)
+        return embedding
+
+    async def async_get_embeddings_batch_and_usage(
+        self, texts: List[str]
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        # Only send the texts that are not cached, in as few requests as the
+        # batch size allows
+        embeddings: List[List[float]] = []
+        usages: List[Optional[Dict]] = []
+        misses: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            key, embedding = self._lookup(text)
+            embeddings.append(embedding or [])
+            usages.append(None)
+            if embedding is None:
+                misses.setdefault(key, []).append(i)
+
+        if misses:
+            miss_texts = [texts[positions[0]] for positions in misses.values()]
+            new_embeddings, new_usages = (
+                await super().async_get_embeddings_batch_and_usage(miss_texts)
+            )
+            for (key, positions), embedding, usage in zip(
+                misses.items(), new_embeddings, new_usages
+            ):
+                self._store(key, embedding)
+                for i in positions:
+                    embeddings[i] = embedding
+                    usages[i] = usage
+        return embeddings, usages
 
-NSEC = getenv("BUYER_AGENT_KEY")
 
-OPENAI_API_KEY = getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY is None:
-    raise ValueError("OPENAI_API_KEY environment variable is not set")
+# Set logging to WARN level to suppress INFO logs
+logging.basicConfig(level=logging.WARN)
 
-DB_USERNAME = getenv("DB_USERNAME")
-if DB_USERNAME is None:
-    raise ValueError("DB_USERNAME environment variable is not set")
 
-DB_PASSWORD = getenv("DB_PASSWORD")
-if DB_PASSWORD is None:
-    raise ValueError("DB_PASSWORD environment variable is not set")
+script_dir = Path(__file__).parent
 
-DB_HOST = getenv("DB_HOST")
-if DB_HOST is None:
-    raise ValueError("DB_HOST environment variable is not set")
 
-DB_PORT = getenv("DB_PORT")
-if DB_PORT is None:
-    raise ValueError("DB_PORT environment variable is not set")
+def required_env(name: str) -> str:
+    """
+    Return the value of a required environment variable.
+    """
+    value = getenv(name)
+    if value is None:
+        raise ValueError(f"{name} environment variable is not set")
+    return value
 
-DB_NAME = getenv("DB_NAME")
-if DB_NAME is None:
-    raise ValueError("DB_NAME environment variable is not set")
 
 # Buyer profile constants
 NAME = "snovalley"
@@ -87,62 +158,42 @@ WEBSITE = "https://www.snovalley.org"
 # Initialize a buyer profile
 
 
-# Initialize database connection
-db_url = (
-    f"postgresql+psycopg://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
-
-engine = create_engine(db_url)
-SessionLocal = sessionmaker(bind=engine)
-
-
-class Base(DeclarativeBase):
-    pass
-
-
-class Seller(Base):
+def create_db_engine() -> Engine:
     """
-    SQLAlchemy model for table `sellers` in the ai schema.
+    Create the connection pool shared by the knowledge base and the reset.
+    PgVector only works with a synchronous engine and runs its async searches
+    in worker threads, so the pool is sized for concurrent /chat requests.
     """
-
-    __tablename__ = "sellers"
-    __table_args__ = {"schema": "nostr"}  # If the table is inside the 'ai' schema
-
-    id = Column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
-    )  # UUID primary key
-    name = Column(Text, nullable=True)
-    meta_data = Column(JSONB, default={})
-    filters = Column(JSONB, default={})
-    content = Column(Text, nullable=True)
-    embedding: Optional[Vector] = Column(Vector(1536), nullable=True)
-    usage = Column(JSONB, default={})
-    content_hash = Column(Text, nullable=True)
-
-    def __repr__(self) -> str:
-        """
-        Return a string representation of the Seller object.
-        """
-        return f"<Seller(id={self.id}, name={self.name})>"
+    # Database connection URL
+    db_url = (
+        f"postgresql+psycopg://{required_env('DB_USERNAME')}:"
+        f"{required_env('DB_PASSWORD')}@{required_env('DB_HOST')}:"
+        f"{required_env('DB_PORT')}/{required_env('DB_NAME')}"
+    )
+    return create_engine(
+        db_url,
+        pool_size=20,
+        max_overflow=10,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        # recycle before PgBouncer/RDS drop idle connections
+        pool_recycle=300,
+    )
 
 
 # Function to drop and recreate the table
-def reset_database() -> None:
+def reset_database(engine: Engine, vector_db: PgVector) -> None:
     """
-    Drop and recreate all tables and schema in the database.
+    Drop and recreate the knowledge base table, and the schema it lives in.
+    The table definition is PgVector's, so it has every column PgVector uses.
     """
     with engine.begin() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
-        conn.execute(text("CREATE SCHEMA IF NOT EXISTS ai;"))
-        Base.metadata.drop_all(bind=conn)
-        Base.metadata.create_all(bind=conn)
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS nostr;"))
+        vector_db.table.drop(conn, checkfirst=True)
+        vector_db.table.create(conn)
 
 
-if getenv("RESET_DATABASE", "").lower() in ("true", "1", "yes"):
-    print("Resetting database...")
-    reset_database()
-    print("Database reset complete.")
-
 INSTRUCTIONS = """
     You're an tourist AI assistant for people visiting Snoqualmie.
     You help visitors find things to do, places to go, and things to buy
@@ -190,6 +241,12 @@ INSTRUCTIONS = """
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Initialize SDK client and other async-related setup here
 
+    # Load environment variables from .env
+    load_dotenv(script_dir / ".env")
+
+    NSEC = getenv("BUYER_AGENT_KEY")
+    OPENAI_API_KEY = required_env("OPENAI_API_KEY")
+
     if NSEC is None:
         keys = generate_keys(env_var="BUYER_AGENT_KEY", env_path=script_dir / ".env")
     else:
@@ -205,28 +262,71 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     profile.set_website(WEBSITE)
     profile.set_nip05(f"{NAME}@synvya.com")
 
+    engine = create_db_engine()
+
+    # OpenAIChat builds a new HTTP client for every async request unless it is
+    # handed one. Share a single pooled HTTP/2 client between the chat model
+    # and the embedder so repeated queries reuse the connection to OpenAI.
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        timeout=60,
+    )
+    embedder = CachedOpenAIEmbedder(
+        enable_batch=True,
+        # openai's stubs name httpx2.AsyncClient; the httpx client works at runtime
+        async_client=AsyncOpenAI(
+            api_key=OPENAI_API_KEY, http_client=http_client  # type: ignore[arg-type]
+        ),
+    )
+
     vector_db = PgVector(
         table_name="sellers",
-        db_url=db_url,
+        db_engine=engine,
         schema="nostr",
         search_type=SearchType.vector,
-        embedder=OpenAIEmbedder(),
+        vector_index=HNSW(ef_search=40),
+        embedder=embedder,
     )
 
+    def prepare_database() -> None:
+        if getenv("RESET_DATABASE", "").lower() in ("true", "1", "yes"):
+            print("Resetting database...")
+            reset_database(engine, vector_db)
+            print("Database reset complete.")
+
+        # Without the HNSW index every search is a sequential scan of all the
+        # embeddings; both calls are no-ops once the table and index exist
+        vector_db.create()
+        vector_db.optimize()
+
     knowledge_base = Knowledge(vector_db=vector_db)
 
-    app.state.buyer_tools = await BuyerTools.create(
-        knowledge_base=knowledge_base,
-        relays=RELAY,
-        private_key=keys.get_private_key(),
-        log_level=logging.DEBUG,
+    # The database DDL, the relay connections and the first request to the
+    # embeddings API don't depend on each other. Run them side by side; the
+    # warm-up opens the connection to OpenAI before the first visitor query.
+    app.state.buyer_tools, _, _ = await asyncio.gather(
+        BuyerTools.create(
+            knowledge_base=knowledge_base,
+            relays=RELAY,
+            private_key=keys.get_private_key(),
+            log_level=logging.WARNING,
+        ),
+        asyncio.to_thread(prepare_database),
+        embedder.async_get_embedding("warmup"),
     )
 
-    await app.state.buyer_tools.async_set_profile(profile)
+    # One throwaway search checks out a pooled connection, pages in the HNSW
+    # index and opens the embedder's sync client (PgVector searches in a
+    # worker thread) so the first visitor doesn't pay for any of it
+    await asyncio.gather(
+        app.state.buyer_tools.async_set_profile(profile),
+        knowledge_base.async_search("warmup", max_results=1),
+    )
 
     app.state.buyer = Agent(
         name="Virtual Guide for the Snoqualmie Valley",
-        model=OpenAIChat(id="gpt-4o", api_key=OPENAI_API_KEY),
+        model=OpenAIChat(id="gpt-4o", api_key=OPENAI_API_KEY, http_client=http_client),
         tools=[app.state.buyer_tools],
         num_history_runs=10,
         read_chat_history=True,
@@ -238,7 +338,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     yield  # Lifespan context manager ends here
 
+    await http_client.aclose()
+    engine.dispose()
 
+
+# The default JSONResponse is kept. /chat declares its response model, so
+# FastAPI serializes it to JSON bytes through Pydantic in one pass, and
+# ORJSONResponse is deprecated in current FastAPI
 app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
@@ -258,6 +364,10 @@ app.add_middleware(
 )
 
 
+# Markdown image syntax: ![alt text](url)
+IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
+
+
 class QueryRequest(BaseModel):
     """
     Simple request model for the buyer agent.
@@ -288,13 +398,15 @@ class CompleteChatResponse(BaseModel):
     """Model for complete chat responses with rich content"""
 
     request_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
+    timestamp: str = Field(
+        default_factory=lambda: datetime.datetime.now(datetime.timezone.utc).isoformat()
+    )
     content: List[Union[TextContent, ImageContent]]
     query: str
 
 
 @app.get("/health")
-def health_check() -> dict:
+async def health_check() -> dict:
     """
     Simple health-check endpoint.
     """
@@ -309,7 +421,9 @@ async def chat(request: QueryRequest, fastapi_request: Request) -> CompleteChatR
     """
     try:
         # Run in non-streaming mode
-        response = await app.state.buyer.arun(request.query, stream=False)
+        response = await fastapi_request.app.state.buyer.arun(
+            request.query, stream=False
+        )
 
         # Get text content
         text_content = response.get_content_as_string()
@@ -319,34 +433,22 @@ async def chat(request: QueryRequest, fastapi_request: Request) -> CompleteChatR
 
         # Example of extracting image references from text (very simplified)
         # In a real implementation, your LLM would provide structured data about images
-        if "![" in text_content and "](" in text_content:
-            # Simple markdown image syntax detection
-            parts = text_content.split("![")
-
-            # Add initial text if any
-            if parts[0]:
-                content_parts.append(TextContent(text=parts[0]))
-
-            # Process each image and text after it
-            for part in parts[1:]:
-                if "](" in part:
-                    alt_end = part.index("](")
-                    url_end = part.index(")", alt_end)
-
-                    alt_text = part[:alt_end]
-                    url = part[alt_end + 2 : url_end]
-
-                    # Add the image
-                    content_parts.append(
-                        ImageContent(url=url, alt_text=alt_text, caption=alt_text)
-                    )
-
-                    # Add text after the image if any
-                    if url_end + 1 < len(part):
-                        content_parts.append(TextContent(text=part[url_end + 1 :]))
-        else:
-            # No images, just text
-            content_parts.append(TextContent(text=text_content))
+        pos = 0
+        for match in IMAGE_RE.finditer(text_content):
+            # Add the text before the image if any
+            if match.start() > pos:
+                content_parts.append(
+                    TextContent(text=text_content[pos : match.start()])
+                )
+            alt_text, url = match.group(1), match.group(2)
+            content_parts.append(
+                ImageContent(url=url, alt_text=alt_text, caption=alt_text)
+            )
+            pos = match.end()
+
+        # Add the text after the last image, or all of it if there are no images
+        if pos < len(text_content) or not content_parts:
+            content_parts.append(TextContent(text=text_content[pos:]))
 
         return CompleteChatResponse(content=content_parts, query=request.query)
     except Exception as e:
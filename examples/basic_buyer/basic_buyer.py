@@ -3,25 +3,35 @@ Basic buyer agent example.
 """
 
 import asyncio
+import datetime
+import hashlib
 import json
 import logging
-import uuid
-from os import getenv
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from os import environ, getenv
 from pathlib import Path
-from typing import Optional
+from typing import Any, Coroutine, Dict, List, Optional, Tuple, TypeVar, Union
 
 from dotenv import load_dotenv
-from pgvector.sqlalchemy import Vector  # Correct import for vector storage
-from sqlalchemy import Column, String, Text, create_engine
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import DeclarativeBase
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy import URL, cast, create_engine, select
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 
 from agno.agent import Agent
+from agno.knowledge.document import Document
 from agno.knowledge.embedder.openai import OpenAIEmbedder
 from agno.knowledge.knowledge import Knowledge
 from agno.models.openai import OpenAIChat
-from agno.vectordb.pgvector import PgVector, SearchType
+from agno.run.agent import RunContentEvent
+from agno.utils.log import logger
+from agno.vectordb.distance import Distance
+from agno.vectordb.pgvector import HNSW, PgVector, SearchType
 from synvya_sdk import (
     KeyEncoding,
     Label,
@@ -32,6 +42,30 @@ from synvya_sdk import (
 )
 from synvya_sdk.agno import BuyerTools
 
+# uvloop is a faster drop-in event loop; it is not available on Windows
+try:
+    import uvloop  # type: ignore[import-not-found]
+
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+T = TypeVar("T")
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on uvloop when it is installed, and on the standard event
+    loop otherwise.
+    """
+    if HAS_UVLOOP:
+        # uvloop.run picks the right mechanism for the Python version instead
+        # of replacing the global event loop policy, which 3.12 deprecates
+        result: T = uvloop.run(main)
+        return result
+    return asyncio.run(main)
+
+
 # Set logging to WARN level to suppress INFO logs
 
 
@@ -52,34 +86,38 @@ if NSEC is None:
 else:
     keys = NostrKeys(private_key=NSEC)
 
+# Encode the key pair once for everything below that needs it
+NPUB_BECH32 = keys.get_public_key(KeyEncoding.BECH32)
+NSEC_BECH32 = keys.get_private_key(KeyEncoding.BECH32)
+
 # Load or use default relay
-RELAY = getenv("RELAY")
-if RELAY is None:
-    RELAY = "wss://relay.damus.io"
+RELAY = getenv("RELAY") or "wss://relay.damus.io"
 
-OPENAI_API_KEY = getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY is None:
-    raise ValueError("OPENAI_API_KEY environment variable is not set")
+# Maximum number of merchant fetches sent to the relay at once
+FETCH_CONCURRENCY = int(getenv("BUYER_FETCH_CONCURRENCY") or 8)
 
-DB_USERNAME = getenv("DB_USERNAME")
-if DB_USERNAME is None:
-    raise ValueError("DB_USERNAME environment variable is not set")
+# Set BUYER_RESET=1 to empty the knowledge base on startup
+RESET = getenv("BUYER_RESET") == "1"
 
-DB_PASSWORD = getenv("DB_PASSWORD")
-if DB_PASSWORD is None:
-    raise ValueError("DB_PASSWORD environment variable is not set")
+# Seconds after a refresh during which the merchants are not downloaded again
+REFRESH_TTL = datetime.timedelta(seconds=int(getenv("BUYER_REFRESH_TTL") or 3600))
 
-DB_HOST = getenv("DB_HOST")
-if DB_HOST is None:
-    raise ValueError("DB_HOST environment variable is not set")
 
-DB_PORT = getenv("DB_PORT")
-if DB_PORT is None:
-    raise ValueError("DB_PORT environment variable is not set")
+def required_env(*names: str) -> Tuple[str, ...]:
+    """
+    Return the values of required environment variables.
+
+    Every missing variable is reported in a single error.
+    """
+    missing = [name for name in names if name not in environ]
+    if missing:
+        raise ValueError(f"Environment variables not set: {', '.join(missing)}")
+    return tuple(environ[name] for name in names)
 
-DB_NAME = getenv("DB_NAME")
-if DB_NAME is None:
-    raise ValueError("DB_NAME environment variable is not set")
+
+OPENAI_API_KEY, DB_USERNAME, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME = required_env(
+    "OPENAI_API_KEY", "DB_USERNAME", "DB_PASSWORD", "DB_HOST", "DB_PORT", "DB_NAME"
+)
 
 
 # Buyer profile constants
@@ -91,114 +129,470 @@ NIP05 = "buyer-agent@synvya.com"
 
 
 # Initialize database connection
-DB_URL = (
-    f"postgresql+psycopg://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# (URL.create escapes the credentials, so they may contain URL delimiters)
+DB_URL = URL.create(
+    "postgresql+psycopg",
+    username=DB_USERNAME,
+    password=DB_PASSWORD,
+    host=DB_HOST,
+    port=int(DB_PORT),
+    database=DB_NAME,
 )
 
-engine = create_engine(DB_URL)
-
-
-class Base(DeclarativeBase):
-    pass
+# Candidates visited by each HNSW search; higher trades latency for recall
+HNSW_EF_SEARCH = 100
+
+# One pool for the whole process, shared by the reset and the knowledge base.
+# LIFO hands out the most recently used connection, so the extra ones sit idle
+# long enough for pool_recycle to retire them.
+engine = create_engine(
+    DB_URL,
+    pool_size=10,
+    max_overflow=20,
+    pool_use_lifo=True,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    connect_args={
+        # PgVector runs the same few statements over and over; let the server
+        # prepare them on their first use instead of after psycopg's default 5
+        "prepare_threshold": 0,
+        # JIT compiling the short similarity queries costs more than it saves.
+        # The HNSW search depth is set here once per connection rather than
+        # with an extra statement before every search
+        "options": f"-c jit=off -c hnsw.ef_search={HNSW_EF_SEARCH}",
+    },
+)
 
 
-class Seller(Base):
+@dataclass
+class PersistentCachedOpenAIEmbedder(OpenAIEmbedder):
     """
-    SQLAlchemy model for table `sellers` in the ai schema.
+    OpenAIEmbedder that keeps every embedding in a local SQLite file.
+    Repopulating the knowledge base after a reset re-embeds the same merchant
+    profiles; with the cache only new or changed content reaches the API.
+    Merchants are stored concurrently, one document per upsert, so async
+    requests that miss the cache are collected and sent as a single batch.
+    The most recently used embeddings, such as repeated visitor queries, are
+    also kept in memory.
     """
 
-    __tablename__ = "sellers"
-    # __table_args__ = {"schema": "ai"}  # If the table is inside the 'ai' schema
-    __table_args__ = {"schema": "nostr"}  # If the table is inside the 'ai' schema
-
-    id = Column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
-    )  # UUID primary key
-    name = Column(Text, nullable=True)
-    meta_data = Column(JSONB, default={})
-    filters = Column(JSONB, default={})
-    content = Column(Text, nullable=True)
-    embedding: Optional[Vector] = Column(Vector(1536), nullable=True)
-    usage = Column(JSONB, default={})
-    content_hash = Column(Text, nullable=True)
-    content_id = Column(Text, nullable=True)
-
-    def __repr__(self) -> str:
+    cache_path: Path = script_dir / "embeddings.sqlite"
+    memory_cache_size: int = 1024
+    _recent: "OrderedDict[str, List[float]]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _conn: Optional[sqlite3.Connection] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _pending: Dict[
+        str, Tuple[str, "asyncio.Future[Tuple[List[float], Optional[Dict]]]"]
+    ] = field(default_factory=dict, init=False, repr=False)
+    _flush_task: Optional["asyncio.Task[None]"] = field(
+        default=None, init=False, repr=False
+    )
+
+    def _db(self) -> sqlite3.Connection:
+        # PgVector searches from worker threads, so share one guarded connection
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+            )
+        return self._conn
+
+    def _key(self, text: str) -> str:
+        source = f"{self.id}:{self.dimensions}:{text}".encode("utf-8")
+        return hashlib.blake2b(source, digest_size=32).hexdigest()
+
+    def _remember(self, key: str, embedding: List[float]) -> None:
+        # called with the lock held
+        self._recent[key] = embedding
+        self._recent.move_to_end(key)
+        if len(self._recent) > self.memory_cache_size:
+            self._recent.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._recent.get(key)
+            if embedding is not None:
+                self._recent.move_to_end(key)
+                return embedding
+            row = (
+                self._db()
+                .execute("SELECT embedding FROM embeddings WHERE key = ?", (key,))
+                .fetchone()
+            )
+            if row is None:
+                return None
+            embedding = array("d", row[0]).tolist()
+            self._remember(key, embedding)
+        return embedding
+
+    def _store(self, key: str, embedding: List[float]) -> None:
+        # failed requests return an empty embedding, don't remember those
+        if embedding:
+            with self._lock, self._db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                    (key, array("d", embedding).tobytes()),
+                )
+                self._remember(key, embedding)
+
+    async def async_warmup(self, texts: List[str]) -> None:
         """
-        Return a string representation of the Seller object.
+        Embed the given texts ahead of time, in a single request for all
+        those not cached yet.
         """
-        return f"<Seller(id={self.id}, name={self.name})>"
-
-
-# Function to drop and recreate the table
-def reset_database() -> None:
+        await self.async_get_embeddings_batch_and_usage(texts)
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        key = self._key(text)
+        embedding = self._lookup(key)
+        if embedding is not None:
+            return embedding, None
+        embedding, usage = super().get_embedding_and_usage(text)
+        self._store(key, embedding)
+        return embedding, usage
+
+    def _enqueue(
+        self, key: str, text: str
+    ) -> "asyncio.Future[Tuple[List[float], Optional[Dict]]]":
+        pending = self._pending.get(key)
+        if pending is not None:
+            return pending[1]
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            # every request made before the flush runs joins the same batch
+            self._flush_task = loop.create_task(self._flush())
+        future = loop.create_future()
+        self._pending[key] = (text, future)
+        return future
+
+    async def _flush(self) -> None:
+        batch, self._pending = self._pending, {}
+        texts = [text for text, _ in batch.values()]
+        try:
+            embeddings, usages = await super().async_get_embeddings_batch_and_usage(
+                texts
+            )
+        except Exception as e:
+            for _, future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (key, (_, future)), embedding, usage in zip(
+            batch.items(), embeddings, usages
+        ):
+            self._store(key, embedding)
+            if not future.done():
+                future.set_result((embedding, usage))
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        return (await self.async_get_embedding_and_usage(text))[0]
+
+    async def async_get_embedding_and_usage(
+        self, text: str
+    ) -> Tuple[List[float], Optional[Dict]]:
+        key = self._key(text)
+        embedding = self._lookup(key)
+        if embedding is not None:
+            return embedding, None
+        return await self._enqueue(key, text)
+
+    async def async_get_embeddings_batch_and_usage(
+        self, texts: List[str]
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        # Only the texts that are not cached are sent, each distinct text once,
+        # together with the misses of any concurrent callers
+        entries: List[
+            Union[
+                Tuple[List[float], Optional[Dict]],
+                "asyncio.Future[Tuple[List[float], Optional[Dict]]]",
+            ]
+        ] = []
+        for text in texts:
+            key = self._key(text)
+            embedding = self._lookup(key)
+            entries.append(
+                (embedding, None) if embedding is not None else self._enqueue(key, text)
+            )
+        results = [
+            entry if isinstance(entry, tuple) else await entry for entry in entries
+        ]
+        return [embedding for embedding, _ in results], [usage for _, usage in results]
+
+
+# Comparator method implementing each PgVector distance
+DISTANCE_METHODS = {
+    Distance.cosine: "cosine_distance",
+    Distance.l2: "l2_distance",
+    Distance.max_inner_product: "max_inner_product",
+}
+
+
+class HalfPrecisionPgVector(PgVector):
     """
-    Drop and recreate all tables in the database.
+    PgVector that indexes the embeddings at half precision.
+    The HNSW index is built over the embeddings cast to halfvec, which halves
+    its size and the memory read on every probe. Searches take a wider set of
+    candidates from that index and re-rank them with the stored full precision
+    embeddings, so recall stays close to a full precision index.
     """
-    with engine.connect() as conn:
-        # Enable pgvector extension
-        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
-        conn.commit()
-
-    # Drop and recreate all tables
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
 
-
-# remove comment to delete the contents of the database for the
-# knowlege base and start fresh
-# reset_database()
-
-vector_db = PgVector(
+    # Candidates taken from the index for each search; must not exceed
+    # HNSW_EF_SEARCH
+    rerank_candidates = 40
+
+    def _create_hnsw_index(
+        self, sess: Session, table_fullname: str, index_distance: str
+    ) -> None:
+        vector_index = self.vector_index
+        if not isinstance(vector_index, HNSW):
+            raise TypeError(
+                f"HalfPrecisionPgVector requires an HNSW index, got {vector_index!r}"
+            )
+        sess.execute(
+            text(
+                f'CREATE INDEX "{vector_index.name}" ON {table_fullname} '
+                f"USING hnsw ((embedding::halfvec({self.dimensions})) "
+                f"{index_distance.replace('vector_', 'halfvec_')}) "
+                "WITH (m = :m, ef_construction = :ef_construction);"
+            ),
+            {"m": vector_index.m, "ef_construction": vector_index.ef_construction},
+        )
+
+    def vector_search(
+        self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        query_embedding = self.embedder.get_embedding(query)
+        if not query_embedding:
+            return []
+
+        distance = DISTANCE_METHODS[self.distance]
+        halfvec = HALFVEC(self.dimensions)
+        candidates = select(self.table.c.id)
+        if filters is not None:
+            candidates = candidates.where(self.table.c.meta_data.contains(filters))
+        candidates = candidates.order_by(
+            getattr(cast(self.table.c.embedding, halfvec), distance)(
+                cast(query_embedding, halfvec)
+            )
+        ).limit(max(limit, self.rerank_candidates))
+
+        # One statement selects and re-ranks the candidates. The embeddings
+        # themselves are not returned: nothing downstream reads them and each
+        # one is several kilobytes
+        stmt = (
+            select(
+                self.table.c.id,
+                self.table.c.name,
+                self.table.c.meta_data,
+                self.table.c.content,
+                self.table.c.usage,
+            )
+            .where(self.table.c.id.in_(candidates.scalar_subquery()))
+            .order_by(getattr(self.table.c.embedding, distance)(query_embedding))
+            .limit(limit)
+        )
+
+        try:
+            # hnsw.ef_search is set on every connection when it is opened
+            with self.Session() as sess:
+                rows = sess.execute(stmt).fetchall()
+        except ProgrammingError as e:
+            # Only a missing table is an empty knowledge base; as in PgVector,
+            # create it for future use. Anything else is a real error
+            if self.table_exists():
+                raise
+            logger.error(
+                "Error performing semantic search: %s; table %s does not exist, "
+                "creating it for future use",
+                e,
+                self.table.fullname,
+            )
+            self.create()
+            return []
+
+        documents = [
+            Document(
+                id=row.id,
+                name=row.name,
+                meta_data=row.meta_data,
+                content=row.content,
+                embedder=self.embedder,
+                usage=row.usage,
+            )
+            for row in rows
+        ]
+        if self.reranker:
+            documents = self.reranker.rerank(query=query, documents=documents)
+        return documents
+
+
+embedder = PersistentCachedOpenAIEmbedder(batch_size=256)
+
+vector_db = HalfPrecisionPgVector(
     table_name="sellers",
-    db_url=DB_URL,
+    db_engine=engine,
     schema="nostr",
     search_type=SearchType.vector,
-    embedder=OpenAIEmbedder(),
+    # pgvector's default build effort
+    vector_index=HNSW(
+        name="sellers_halfvec_hnsw_index",
+        ef_construction=64,
+        ef_search=HNSW_EF_SEARCH,
+    ),
+    embedder=embedder,
 )
 
 knowledge_base = Knowledge(vector_db=vector_db)
 
 
+# Function to empty the table
+def reset_database() -> None:
+    """
+    Empty the sellers table, creating it first if it doesn't exist, and forget
+    when it was last refreshed.
+
+    The HNSW index is dropped as well: building it once over the repopulated
+    table with `build_index()` is much faster than updating it on every insert.
+    """
+    # One transaction for the whole reset; the table definition is PgVector's
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS nostr;"))
+        vector_db.table.create(conn, checkfirst=True)
+        conn.execute(text("DROP INDEX IF EXISTS nostr.sellers_halfvec_hnsw_index;"))
+        conn.execute(text("TRUNCATE nostr.sellers;"))
+        conn.execute(text("DROP TABLE IF EXISTS nostr.sellers_refresh;"))
+
+
+def build_index() -> None:
+    """
+    Create the HNSW index on the seller embeddings if it doesn't exist yet.
+    """
+    vector_db.optimize()
+
+
 # Update the buyer profile
-profile = Profile(keys.get_public_key(KeyEncoding.BECH32))
+profile = Profile(NPUB_BECH32)
 profile.set_name(NAME)
 profile.set_about(DESCRIPTION)
 profile.set_display_name(DISPLAY_NAME)
 profile.set_picture(PICTURE)
 profile.set_nip05(NIP05)
 
-buyer_tools = asyncio.run(
-    BuyerTools.create(
+
+async def create_buyer_tools() -> BuyerTools:
+    """
+    Connect to the relay and publish the buyer profile in one event loop.
+    """
+    tools = await BuyerTools.create(
         knowledge_base=knowledge_base,
         relays=RELAY,
-        private_key=keys.get_private_key(KeyEncoding.BECH32),
+        private_key=NSEC_BECH32,
         log_level=logging.INFO,
     )
+    await tools.async_set_profile(profile)
+    return tools
+
+
+# Created on first use, so importing the module doesn't connect to the relay
+_buyer_tools: Optional[BuyerTools] = None
+
+
+async def get_buyer_tools() -> BuyerTools:
+    """
+    Return the buyer tools, connecting to the relay the first time.
+    """
+    global _buyer_tools
+    if _buyer_tools is None:
+        _buyer_tools = await create_buyer_tools()
+    return _buyer_tools
+
+
+# Merchant labels downloaded by refresh_knowledge_base and their profile filters
+REFRESH_LABELS = (Label.RETAIL, Label.RESTAURANT, Label.OTHER)
+REFRESH_FILTERS = tuple(
+    {"namespace": Namespace.BUSINESS_TYPE.value, "label": label.value}
+    for label in REFRESH_LABELS
 )
 
-asyncio.run(buyer_tools.async_set_profile(profile))
 
+def last_refreshed_at() -> Optional[datetime.datetime]:
+    """
+    Return when the knowledge base was last refreshed, if ever.
+    """
+    with engine.connect() as conn:
+        marker = text("SELECT to_regclass('nostr.sellers_refresh');")
+        if conn.execute(marker).scalar() is None:
+            return None
+        return conn.execute(
+            text("SELECT refreshed_at FROM nostr.sellers_refresh;")
+        ).scalar()
 
-async def refresh_knowledge_base() -> None:
-    # reset_database()
 
-    labels = [
-        Label.RETAIL,
-        Label.RESTAURANT,
-        Label.OTHER,
-    ]
+def record_refresh() -> None:
+    """
+    Remember that the knowledge base was refreshed just now.
 
-    for label in labels:
-        profile_filter_json = {
-            "namespace": Namespace.BUSINESS_TYPE.value,
-            "label": label.value,
-        }
+    The sellers table can't tell: unchanged merchants aren't written again.
+    """
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS nostr.sellers_refresh "
+                "(refreshed_at TIMESTAMPTZ NOT NULL);"
+            )
+        )
+        conn.execute(text("DELETE FROM nostr.sellers_refresh;"))
+        conn.execute(text("INSERT INTO nostr.sellers_refresh VALUES (now());"))
+
+
+async def refresh_knowledge_base(force: bool = False) -> None:
+    buyer_tools = await get_buyer_tools()
+
+    # Restarting the example shouldn't download and embed every merchant again
+    last_refresh = await asyncio.to_thread(last_refreshed_at)
+    if (
+        not force
+        and last_refresh is not None
+        and datetime.datetime.now(datetime.timezone.utc) - last_refresh < REFRESH_TTL
+    ):
+        print(f"Knowledge base refreshed at {last_refresh}; skipping refresh")
+        # A previous run may have stopped before building the index
+        await asyncio.to_thread(build_index)
+        return
+
+    # The fetches for each label are independent; overlap the relay round-trips
+    # but keep at most FETCH_CONCURRENCY of them in flight
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def fetch(profile_filter_json: dict) -> str:
+        async with semaphore:
+            return await buyer_tools.async_get_merchants(profile_filter_json)
+
+    responses = await asyncio.gather(
+        *[fetch(profile_filter_json) for profile_filter_json in REFRESH_FILTERS]
+    )
 
-        print(f"Fetching merchants for label='{label.value}'")
-        response = await buyer_tools.async_get_merchants(profile_filter_json)
+    for label, response in zip(REFRESH_LABELS, responses):
+        print(f"Fetched merchants for label='{label.value}'")
         print(response)
 
+    # After a reset the index is only built once the table is populated
+    await asyncio.to_thread(build_index)
+
+    # Only a refresh where every label was fetched counts towards the TTL
+    if all(json.loads(response)["status"] == "success" for response in responses):
+        await asyncio.to_thread(record_refresh)
+
 
 async def query_knowledge_base(search_query: str) -> None:
     profile_filter_json = {
@@ -206,6 +600,7 @@ async def query_knowledge_base(search_query: str) -> None:
         "label": Label.RESTAURANT.value,
     }
 
+    buyer_tools = await get_buyer_tools()
     response = buyer_tools.get_merchants_from_knowledge_base(
         search_query, profile_filter_json
     )
@@ -216,51 +611,71 @@ async def query_knowledge_base(search_query: str) -> None:
 # from the marketplace "Historic Downtown Snoqualmie" with the public key
 # "npub1nar4a3vv59qkzdlskcgxrctkw9f0ekjgqaxn8vd0y82f9kdve9rqwjcurn".
 
-buyer = Agent(
-    name=f"AI Agent for {profile.get_name()}",
-    model=OpenAIChat(id="gpt-4o", api_key=OPENAI_API_KEY),
-    tools=[buyer_tools],
-    num_history_runs=10,
-    knowledge=knowledge_base,
-    search_knowledge=True,
-    debug_mode=False,
-    instructions=[
-        """
-        You're an tourist AI assistant for people visiting Snoqualmie.
-        You help visitors find things to do, places to go, and things to buy
-        from the businesses (also known as merchants) in Snoqualmie Valley.
-
-        When asked to find merchants, you will use the tool
-        `get_merchants_from_knowledge_base` with a profile filter to find the merchants.
-
-        Here is an example profile filter:
-        {
-           "namespace": "business.type",
-           "label": "restaurant",
-        }
-
-        namespace is always "business.type".
-
-        Here is the list of valid labels:
-        - "retail"
-        - "restaurant"
-        - "service"
-        - "business"
-        - "entertainment"
-        - "other"
-
-        Select the most relevant label based on the user's query.
-
-        Include pictures of the businesses in your response when possible.
-        """.strip(),
-    ],
-)
+
+def create_buyer(buyer_tools: BuyerTools) -> Agent:
+    """
+    Create the buyer agent.
+    """
+    return Agent(
+        name=f"AI Agent for {profile.get_name()}",
+        model=OpenAIChat(id="gpt-4o", api_key=OPENAI_API_KEY),
+        tools=[buyer_tools],
+        num_history_runs=10,
+        knowledge=knowledge_base,
+        search_knowledge=True,
+        debug_mode=False,
+        instructions=[
+            """
+            You're an tourist AI assistant for people visiting Snoqualmie.
+            You help visitors find things to do, places to go, and things to buy
+            from the businesses (also known as merchants) in Snoqualmie Valley.
+
+            When asked to find merchants, you will use the tool
+            `get_merchants_from_knowledge_base` with a profile filter to find the merchants.
+
+            Here is an example profile filter:
+            {
+               "namespace": "business.type",
+               "label": "restaurant",
+            }
+
+            namespace is always "business.type".
+
+            Here is the list of valid labels:
+            - "retail"
+            - "restaurant"
+            - "service"
+            - "business"
+            - "entertainment"
+            - "other"
+
+            Select the most relevant label based on the user's query.
+
+            Include pictures of the businesses in your response when possible.
+            """.strip(),
+        ],
+    )
+
+
+# Visitor questions embedded before the CLI starts
+WARMUP_QUERIES = [
+    "things to do in Snoqualmie",
+    "restaurants",
+    "coffee shops",
+    "hardware store",
+    "gifts and souvenirs",
+]
 
 
 async def buyer_cli() -> None:
     """
     Command-line interface for the buyer agent.
     """
+    buyer = create_buyer(await get_buyer_tools())
+
+    # Typical first questions are answered without waiting on the embeddings API
+    await embedder.async_warmup(WARMUP_QUERIES)
+
     print("\n🔹 Snoqualmie Valley Visitor Assistant (Type 'exit' to quit)\n")
 
     ##---###
@@ -272,28 +687,40 @@ async def buyer_cli() -> None:
     ##---###
 
     while True:
-        user_query = input("💬 You: ")
+        # Read the prompt on a worker thread so the relay connections and the
+        # database pool stay serviced while waiting for the visitor
+        user_query = await asyncio.to_thread(input, "💬 You: ")
         if user_query.lower() in ["exit", "quit"]:
             print("\n👋 Goodbye!\n")
             break
 
-        response = await buyer.arun(user_query)  # Get response from agent
-        print(f"\n🤖 Visitor Assistant: {response.get_content_as_string()}\n")
+        # Print the answer as the model streams it instead of after the whole run
+        print("\n🤖 Visitor Assistant: ", end="", flush=True)
+        async for event in buyer.arun(user_query, stream=True):
+            if isinstance(event, RunContentEvent) and isinstance(event.content, str):
+                print(event.content, end="", flush=True)
+        print("\n")
 
 
 # Run the CLI
 if __name__ == "__main__":
+    if RESET:
+        print("Resetting database...")
+        reset_database()
+
     # print(f"DB_URL: {DB_URL}")
 
-    # asyncio.run(query_knowledge_base("find me an indian restaurant"))
-    # asyncio.run(refresh_knowledge_base())
+    # run(query_knowledge_base("find me an indian restaurant"))
+    # run(refresh_knowledge_base())
     profile_filter_json = {
         "namespace": Namespace.BUSINESS_TYPE.value,
         "label": Label.RETAIL.value,
     }
 
-    response = asyncio.run(
-        buyer_tools.async_get_classified_listings(profile_filter_json)
-    )
+    async def get_classified_listings() -> str:
+        buyer_tools = await get_buyer_tools()
+        return await buyer_tools.async_get_classified_listings(profile_filter_json)
+
+    response = run(get_classified_listings())
     print(json.dumps(response, indent=2))
-    # asyncio.run(buyer_cli())
+    # run(buyer_cli())
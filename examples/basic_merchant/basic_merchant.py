@@ -36,7 +36,6 @@ if OPENAI_API_KEY is None:
     raise ValueError("OPENAI_API_KEY is not set")
 # print(f"OpenAI API key: {openai_api_key}")
 
-print(f"Private Key: {keys.get_private_key(KeyEncoding.BECH32)}")
 print(f"Public Key (bech32): {keys.get_public_key(KeyEncoding.BECH32)}")
 print(f"Public Key (hex): {keys.get_public_key(KeyEncoding.HEX)}")
 
@@ -28,9 +28,6 @@ try:
 except importlib.metadata.PackageNotFoundError:
     logging.warning("Package 'synvya_sdk' not found. Falling back to 'unknown'.")
     __version__ = "unknown"
-except ImportError:
-    logging.warning("importlib.metadata is not available. Falling back to 'unknown'.")
-    __version__ = "unknown"
 
 # Define What is Exposed at the Package Level
 __all__ = [
@@ -2,21 +2,18 @@
 Module implementing the BuyerTools Toolkit for Agno agents.
 """
 
+import asyncio
 import hashlib
 import json
 import logging
 import re
 import secrets
 from sys import stdout
-from typing import Any, List, Optional, Union, cast
-
-from pydantic import ConfigDict
+from typing import Any, Iterable, List, Optional, Union, cast
 
 from synvya_sdk import (
     ClassifiedListing,
     KeyEncoding,
-    Label,
-    Namespace,
     NostrClient,
     Product,
     Profile,
@@ -77,6 +74,46 @@ def _get_vector_db(knowledge: Knowledge) -> Optional[VectorDb]:
     return cast(Optional[VectorDb], vector_db)
 
 
+def _content_hash(document_id: str, content: str) -> str:
+    """
+    Hash a knowledge base document by its id and its content, so a new
+    version of the same document gets a new hash.
+
+    Args:
+        document_id: id of the document in the vector database
+        content: serialized content of the document
+
+    Returns:
+        str: hex digest identifying this version of the document
+    """
+    source = f"{document_id}\0{content}"
+    return hashlib.blake2b(
+        source.encode("utf-8", errors="ignore"), digest_size=32
+    ).hexdigest()
+
+
+def _needs_storing(vector_db: VectorDb, document_id: str, content_hash: str) -> bool:
+    """
+    Check whether a document must be embedded and stored in the vector database.
+
+    A document whose current version is already stored is skipped, saving
+    the embedding request. Otherwise any previous version of the document
+    is removed so the new one replaces it.
+
+    Args:
+        vector_db: vector database holding the knowledge base
+        document_id: id of the document, also stored as its content id
+        content_hash: hash of the current version from `_content_hash`
+
+    Returns:
+        bool: True if the document must be stored, False if it is up to date
+    """
+    if vector_db.content_hash_exists(content_hash):
+        return False
+    vector_db.delete_by_content_id(document_id)
+    return True
+
+
 class BuyerTools(Toolkit):
     """
     BuyerTools is a toolkit that allows an agent to find sellers and
@@ -90,12 +127,7 @@ class BuyerTools(Toolkit):
     TBD: populate the sellers locations with info from stalls.
     """
 
-    model_config = ConfigDict(
-        arbitrary_types_allowed=True, extra="allow", validate_assignment=True
-    )
-
     _instances_from_create: set[int] = set()
-    merchants: set[Profile]
 
     def __init__(
         self,
@@ -130,8 +162,10 @@ class BuyerTools(Toolkit):
         self.private_key: str = private_key
         self.knowledge_base: Knowledge = knowledge_base
         self.profile: Optional[Profile] = None
+        # Serialized profile, rebuilt lazily after the profile changes
+        self._profile_json: Optional[str] = None
         self._nostr_client: Optional[NostrClient] = None
-        BuyerTools.merchants = set()
+        self.merchants: set[Profile] = set()
 
         # Register methods
         self.register(self.async_get_merchants)
@@ -217,16 +251,16 @@ class BuyerTools(Toolkit):
         # If there is no filter, get all merchants
         if profile_filter_json is None:
             try:
-                self.merchants = await self._nostr_client.async_get_merchants()
+                merchants = await self._nostr_client.async_get_merchants()
             except RuntimeError as e:
                 logger.error("Error downloading merchants from the Nostr relay: %s", e)
                 return json.dumps({"status": "error", "message": str(e)})
+            self.merchants = merchants
 
             # Store merchants in knowledge base
-            for merchant in self.merchants:
-                await self._store_profile_in_kb(merchant)
+            await self._store_profiles_in_kb(merchants)
 
-            response = json.dumps({"status": "success", "count": len(self.merchants)})
+            response = json.dumps({"status": "success", "count": len(merchants)})
             buyer_logger.debug("GET_MERCHANTS: response: %s", response)
             return response
 
@@ -263,20 +297,20 @@ class BuyerTools(Toolkit):
 
         # Get the merchants that match the filter
         try:
-            self.merchants = await self._nostr_client.async_get_merchants(
-                profile_filter
-            )
+            merchants = await self._nostr_client.async_get_merchants(profile_filter)
         except RuntimeError as e:
             buyer_logger.error(
                 "Error downloading merchants from the Nostr relay: %s", e
             )
             return json.dumps({"status": "error", "message": str(e)})
+        self.merchants = merchants
 
         # Store merchants in knowledge base
-        for merchant in self.merchants:
-            await self._store_profile_in_kb(merchant)
+        await self._store_profiles_in_kb(merchants)
 
-        response = json.dumps({"status": "success", "count": len(self.merchants)})
+        # Count this call's merchants; a concurrent call may have replaced
+        # self.merchants while they were being stored
+        response = json.dumps({"status": "success", "count": len(merchants)})
         buyer_logger.debug("GET_MERCHANTS: response: %s", response)
 
         return response
@@ -380,17 +414,15 @@ class BuyerTools(Toolkit):
         buyer_logger.debug("Downloading merchants from the Nostr marketplace %s", name)
         try:
             # Retrieve merchants from the Nostr marketplace
-            self.merchants = (
-                await self._nostr_client.async_get_merchants_in_marketplace(
-                    owner_public_key, name, profile_filter
-                )
+            merchants = await self._nostr_client.async_get_merchants_in_marketplace(
+                owner_public_key, name, profile_filter
             )
+            self.merchants = merchants
             # Store merchants in the knowledge base
-            for merchant in self.merchants:
-                await self._store_profile_in_kb(merchant)
+            await self._store_profiles_in_kb(merchants)
 
             # Return the number of merchants downloaded
-            response = json.dumps({"status": "success", "count": len(self.merchants)})
+            response = json.dumps({"status": "success", "count": len(merchants)})
         except RuntimeError as e:
             buyer_logger.error(
                 "Error downloading merchants from the Nostr marketplace %s: %s",
@@ -422,11 +454,18 @@ class BuyerTools(Toolkit):
                 merchant_public_key, stall
             )
 
-            # store products in the knowledge base
-            for product in products:
-                self._store_product_in_kb(product)
+            # serialize each product once for both the knowledge base and
+            # the response
+            product_jsons = [product.to_json() for product in products]
 
-            response = json.dumps([product.to_dict() for product in products])
+            # store products in the knowledge base; embedding and upserting
+            # block, so run them on a worker thread to keep the event loop free
+            for product, product_json in zip(products, product_jsons):
+                await asyncio.to_thread(
+                    self._store_product_in_kb, product, product_json
+                )
+
+            response = "[" + ", ".join(product_jsons) + "]"
 
         except RuntimeError as e:
             buyer_logger.error(
@@ -493,7 +532,7 @@ class BuyerTools(Toolkit):
         listings_payload: List[dict[str, Any]] = []
         error_merchants: List[str] = []
 
-        for merchant in getattr(self, "merchants", set()):
+        for merchant in self.merchants:
             merchant_key = merchant.get_public_key()
             try:
                 listings = await self._nostr_client.async_get_classified_listings(
@@ -512,7 +551,7 @@ class BuyerTools(Toolkit):
                 if not listing.get_seller():
                     listing.set_seller(merchant_key)
 
-                self._store_classified_listing_in_kb(listing)
+                await asyncio.to_thread(self._store_classified_listing_in_kb, listing)
                 listings_payload.append(listing.to_dict())
 
         if error_merchants:
@@ -565,8 +604,9 @@ class BuyerTools(Toolkit):
         documents = self.knowledge_base.search(
             query=search_query, max_results=100, filters=search_filters
         )
-        for doc in documents:
-            buyer_logger.debug("Document: %s", doc.to_dict())
+        if buyer_logger.isEnabledFor(logging.DEBUG):
+            for doc in documents:
+                buyer_logger.debug("Document: %s", doc.to_dict())
 
         products_json = [doc.content for doc in documents]
         buyer_logger.debug(
@@ -607,8 +647,9 @@ class BuyerTools(Toolkit):
         documents = self.knowledge_base.search(
             query=search_query, max_results=100, filters=search_filters
         )
-        for doc in documents:
-            buyer_logger.debug("Classified document: %s", doc.to_dict())
+        if buyer_logger.isEnabledFor(logging.DEBUG):
+            for doc in documents:
+                buyer_logger.debug("Classified document: %s", doc.to_dict())
 
         listings_json = [doc.content for doc in documents]
         buyer_logger.debug(
@@ -624,7 +665,9 @@ class BuyerTools(Toolkit):
             str: buyer profile json string
         """
         buyer_logger.debug("Getting own profile")
-        return self.profile.to_json()
+        if self._profile_json is None:
+            self._profile_json = self.profile.to_json()
+        return self._profile_json
 
     def get_relay(self) -> str:
         """Get the Nostr relay that the buyer agent is using.
@@ -658,12 +701,17 @@ class BuyerTools(Toolkit):
             # retrieve stalls from the Nostr relay
             stalls = await self._nostr_client.async_get_stalls(merchant_public_key)
 
-            # store stalls in the knowledge base
-            for stall in stalls:
-                self._store_stall_in_kb(stall)
+            # serialize each stall once for both the knowledge base and
+            # the response
+            stall_jsons = [stall.to_json() for stall in stalls]
+
+            # store stalls in the knowledge base; embedding and upserting
+            # block, so run them on a worker thread to keep the event loop free
+            for stall, stall_json in zip(stalls, stall_jsons):
+                await asyncio.to_thread(self._store_stall_in_kb, stall, stall_json)
 
             # convert stalls to JSON string
-            response = json.dumps([stall.to_dict() for stall in stalls])
+            response = "[" + ", ".join(stall_jsons) + "]"
         except RuntimeError as e:
             buyer_logger.error(
                 "Error downloading stalls from merchant %s: %s",
@@ -769,6 +817,7 @@ class BuyerTools(Toolkit):
             str: Nostr profile json string
         """
         self.profile = profile
+        self._profile_json = None
         try:
             await self._nostr_client.async_set_profile(profile)
         except (RuntimeError, ValueError) as e:
@@ -1048,15 +1097,20 @@ class BuyerTools(Toolkit):
         )
         document.content_id = document_id
 
-        hash_source = document_id or profile_json
-        content_hash = hashlib.sha256(
-            hash_source.encode("utf-8", errors="ignore")
-        ).hexdigest()
+        content_hash = _content_hash(document_id, profile_json)
 
         try:
-            await vector_db.async_upsert(content_hash, [document], filters)
-        except NotImplementedError:
-            vector_db.upsert(content_hash, [document], filters)
+            # the vector db lookups are blocking; keep them off the event loop
+            # so concurrent profile downloads and embeddings keep running
+            if await asyncio.to_thread(
+                _needs_storing, vector_db, document_id, content_hash
+            ):
+                try:
+                    await vector_db.async_upsert(content_hash, [document], filters)
+                except NotImplementedError:
+                    await asyncio.to_thread(
+                        vector_db.upsert, content_hash, [document], filters
+                    )
         except Exception as err:
             buyer_logger.error(
                 "Failed to upsert profile %s into vector DB: %s",
@@ -1071,12 +1125,31 @@ class BuyerTools(Toolkit):
         #     filters=filters,
         # )
 
-    def _store_product_in_kb(self, product: Product) -> None:
+    async def _store_profiles_in_kb(self, profiles: Iterable[Profile]) -> None:
+        """
+        Store several Nostr profiles in the vector database concurrently.
+
+        Each profile is stored on its own so a refreshed profile replaces its
+        previous row; the embedding requests, which dominate the cost of
+        storing a profile, overlap instead of running one by one.
+
+        Args:
+            profiles: Nostr profiles to store
+        """
+        await asyncio.gather(
+            *[self._store_profile_in_kb(profile) for profile in profiles]
+        )
+
+    def _store_product_in_kb(
+        self, product: Product, product_json: Optional[str] = None
+    ) -> None:
         """
         Store a Nostr product in the knowledge base.
 
         Args:
             product: Nostr product to store
+            product_json: optional JSON serialization of the product, if
+                the caller already has it
         """
         buyer_logger.debug("Storing product in knowledge base: %s", product.name)
 
@@ -1085,7 +1158,8 @@ class BuyerTools(Toolkit):
             buyer_logger.warning("Vector DB not configured; skipping product storage")
             return
 
-        product_json = product.to_json()
+        if product_json is None:
+            product_json = product.to_json()
         if not product_json:
             buyer_logger.warning(
                 "Product serialization returned empty payload for %s", product.name
@@ -1109,12 +1183,11 @@ class BuyerTools(Toolkit):
             meta_data=metadata.copy(),
         )
         document.content_id = document_id
-        content_hash = hashlib.sha256(
-            document_id.encode("utf-8", errors="ignore")
-        ).hexdigest()
+        content_hash = _content_hash(document_id, product_json)
 
         try:
-            vector_db.upsert(content_hash, [document], metadata)
+            if _needs_storing(vector_db, document_id, content_hash):
+                vector_db.upsert(content_hash, [document], metadata)
         except Exception as err:
             buyer_logger.error(
                 "Failed to upsert product %s into vector DB: %s", product.id, err
@@ -1182,12 +1255,11 @@ class BuyerTools(Toolkit):
             meta_data=metadata.copy(),
         )
         document.content_id = document_id
-        content_hash = hashlib.sha256(
-            document_id.encode("utf-8", errors="ignore")
-        ).hexdigest()
+        content_hash = _content_hash(document_id, listing_json)
 
         try:
-            vector_db.upsert(content_hash, [document], metadata)
+            if _needs_storing(vector_db, document_id, content_hash):
+                vector_db.upsert(content_hash, [document], metadata)
         except Exception as err:
             buyer_logger.error(
                 "Failed to upsert classified listing %s into vector DB: %s",
@@ -1198,12 +1270,16 @@ class BuyerTools(Toolkit):
 
         self.knowledge_base.add_filters(metadata)
 
-    def _store_stall_in_kb(self, stall: Stall) -> None:
+    def _store_stall_in_kb(
+        self, stall: Stall, stall_json: Optional[str] = None
+    ) -> None:
         """
         Store a Nostr stall in the knowledge base.
 
         Args:
             stall: Nostr stall to store
+            stall_json: optional JSON serialization of the stall, if the
+                caller already has it
         """
         buyer_logger.debug("Storing stall in knowledge base: %s", stall.name)
 
@@ -1212,7 +1288,8 @@ class BuyerTools(Toolkit):
             buyer_logger.warning("Vector DB not configured; skipping stall storage")
             return
 
-        stall_json = stall.to_json()
+        if stall_json is None:
+            stall_json = stall.to_json()
         if not stall_json:
             buyer_logger.warning(
                 "Stall serialization returned empty payload for %s", stall.name
@@ -1235,12 +1312,11 @@ class BuyerTools(Toolkit):
             meta_data=metadata.copy(),
         )
         document.content_id = document_id
-        content_hash = hashlib.sha256(
-            document_id.encode("utf-8", errors="ignore")
-        ).hexdigest()
+        content_hash = _content_hash(document_id, stall_json)
 
         try:
-            vector_db.upsert(content_hash, [document], metadata)
+            if _needs_storing(vector_db, document_id, content_hash):
+                vector_db.upsert(content_hash, [document], metadata)
         except Exception as err:
             buyer_logger.error(
                 "Failed to upsert stall %s into vector DB: %s", stall.id, err
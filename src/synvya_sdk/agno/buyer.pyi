@@ -1,5 +1,5 @@
 import logging
-from typing import ClassVar, List, Optional, Set, Union
+from typing import ClassVar, Iterable, List, Optional, Set, Union
 
 from agno.knowledge.knowledge import Knowledge
 from agno.tools import Toolkit
@@ -15,14 +15,15 @@ from synvya_sdk import (
 class BuyerTools(Toolkit):
     # Class variables
     _instances_from_create: ClassVar[Set[int]]
-    merchants: Set[Profile]
 
     # Instance variables
+    merchants: Set[Profile]
     relays: List[str]
     private_key: str
     knowledge_base: Knowledge
     _nostr_client: Optional[NostrClient]
     profile: Optional[Profile]
+    _profile_json: Optional[str]
     _instance_id: int
 
     # Initialization
@@ -98,9 +99,14 @@ class BuyerTools(Toolkit):
     ) -> str: ...
     def _get_product_from_kb(self, product_name: str) -> Product: ...
     async def _store_profile_in_kb(self, profile: Profile) -> None: ...
-    def _store_product_in_kb(self, product: Product) -> None: ...
+    async def _store_profiles_in_kb(self, profiles: Iterable[Profile]) -> None: ...
+    def _store_product_in_kb(
+        self, product: Product, product_json: Optional[str] = None
+    ) -> None: ...
     def _store_classified_listing_in_kb(self, listing: ClassifiedListing) -> None: ...
-    def _store_stall_in_kb(self, stall: Stall) -> None: ...
+    def _store_stall_in_kb(
+        self, stall: Stall, stall_json: Optional[str] = None
+    ) -> None: ...
     def _message_is_payment_request(self, message: str) -> bool: ...
     def _message_is_payment_verification(self, message: str) -> bool: ...
     @staticmethod
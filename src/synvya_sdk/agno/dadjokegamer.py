@@ -18,8 +18,6 @@ import json
 import secrets
 from typing import List, Optional, Union
 
-from pydantic import ConfigDict
-
 from synvya_sdk import Label, Namespace, NostrClient, Profile, ProfileFilter
 
 try:
@@ -36,10 +34,6 @@ class DadJokeGamerTools(Toolkit):
     DadJokeTools is a toolkit that allows an agent to play the Dad Joke game.
     """
 
-    model_config = ConfigDict(
-        arbitrary_types_allowed=True, extra="allow", validate_assignment=True
-    )
-
     _instances_from_create: set[int] = set()
 
     def __init__(
@@ -360,4 +354,4 @@ class DadJokeGamerTools(Toolkit):
         """
         if self.profile is None:
             raise RuntimeError("Profile not initialized. Call create() first.")
-        return json.dumps(self.profile.to_json())
+        return self.profile.to_json()
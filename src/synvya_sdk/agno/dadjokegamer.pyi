@@ -1,14 +1,11 @@
 from typing import ClassVar, List, Optional, Set, Union
 
-from pydantic import ConfigDict
-
 from agno.tools import Toolkit
 from synvya_sdk import NostrClient, Profile
 
 class DadJokeGamerTools(Toolkit):
     # Class variables
     _instances_from_create: ClassVar[Set[int]]
-    model_config: ClassVar[ConfigDict]
 
     # Instance variables
     relays: List[str]
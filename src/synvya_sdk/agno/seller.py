@@ -2,12 +2,10 @@
 Module implementing the MerchantTools Toolkit for Agno agents.
 """
 
+import asyncio
 import json
-import time
-from typing import List, Optional, Tuple, Union
-
-from nostr_sdk import EventId
-from pydantic import ConfigDict
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from synvya_sdk import NostrClient, Product, Profile, Stall
 
@@ -19,6 +17,53 @@ except ImportError as exc:
         "Package `agno` not installed. Please install using `pip install agno`"
     ) from exc
 
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # optional speedup, fall back to the standard library
+    HAS_ORJSON = False
+
+
+def _dumps(obj: Any) -> str:
+    """
+    Serialize a tool result to a JSON string.
+    Uses orjson when it is installed and the standard library otherwise;
+    both produce the same compact output.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        str: JSON string
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj).decode()  # pylint: disable=no-member
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _loads(data: Union[str, bytes]) -> Any:
+    """
+    Deserialize a JSON document received by a tool.
+    Uses orjson when it is installed and the standard library otherwise.
+    Both raise a json.JSONDecodeError subclass on invalid input.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Any: deserialized object
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)  # pylint: disable=no-member
+    return json.loads(data)
+
+
+# Publications in flight at once, and the time each one holds its slot
+# afterwards, so large catalogs stay within relay rate limits
+PUBLISH_CONCURRENCY = 4
+PUBLISH_INTERVAL = 0.5
+
 
 class MerchantTools(Toolkit):
     """
@@ -36,10 +81,6 @@ class MerchantTools(Toolkit):
     update the internal database and simultaneously publish the changes to Nostr.
     """
 
-    model_config = ConfigDict(
-        arbitrary_types_allowed=True, extra="allow", validate_assignment=True
-    )
-
     _instances_from_create: set[int] = set()
 
     def __init__(
@@ -72,13 +113,30 @@ class MerchantTools(Toolkit):
         self.relays: List[str] = [relays] if isinstance(relays, str) else relays
         self.private_key: str = private_key
 
-        self.stall_db: List[Tuple[Stall, Optional[str]]] = [(s, None) for s in stalls]
-        self.product_db: List[Tuple[Product, Optional[str]]] = [
-            (p, None) for p in products
-        ]
+        # Stalls and products are kept as parallel lists with the id of the
+        # event that published each entry (None if not published yet)
+        self._stalls: List[Stall] = list(stalls)
+        self._stall_event_ids: List[Optional[str]] = [None] * len(self._stalls)
+        self._products: List[Product] = list(products)
+        self._product_event_ids: List[Optional[str]] = [None] * len(self._products)
+        # Name -> position indexes into the stall and product lists
+        self._product_index: Dict[str, int] = {}
+        self._stall_index: Dict[str, int] = {}
+        # Id -> position indexes, used to record event ids after publishing
+        self._product_id_index: Dict[str, int] = {}
+        self._stall_id_index: Dict[str, int] = {}
+        # Stall id -> positions of the products in that stall
+        self._products_by_stall: Dict[str, List[int]] = {}
+        # Serialized getter outputs, rebuilt lazily after the data changes.
+        # They are only dropped when the profile, product_db or stall_db are
+        # assigned, so the objects in them must not be mutated in place
+        self._products_json: Optional[str] = None
+        self._stalls_json: Optional[str] = None
+        self._profile_json: Optional[str] = None
+        self._reindex()
 
         self.nostr_client: Optional[NostrClient] = None
-        self.profile: Optional[Profile] = None
+        self._profile: Optional[Profile] = None
 
         # Register methods
         self.register(self.get_profile)
@@ -108,6 +166,49 @@ class MerchantTools(Toolkit):
         if hasattr(self, "_instance_id"):
             MerchantTools._instances_from_create.discard(self._instance_id)
 
+    @property
+    def profile(self) -> Optional[Profile]:
+        """
+        Profile of the merchant. Treated as immutable: assign a new profile
+        instead of changing this one so that get_profile() stays current.
+        """
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile: Optional[Profile]) -> None:
+        self._profile = profile
+        self._profile_json = None
+
+    @property
+    def product_db(self) -> List[Tuple[Product, Optional[str]]]:
+        """
+        Products managed by the toolkit paired with their publication event id.
+        The products are treated as immutable: assign an updated product_db
+        instead of changing them in place so that get_products() stays current.
+        """
+        return list(zip(self._products, self._product_event_ids))
+
+    @product_db.setter
+    def product_db(self, product_db: List[Tuple[Product, Optional[str]]]) -> None:
+        self._products = [product for product, _ in product_db]
+        self._product_event_ids = [event_id for _, event_id in product_db]
+        self._reindex()
+
+    @property
+    def stall_db(self) -> List[Tuple[Stall, Optional[str]]]:
+        """
+        Stalls managed by the toolkit paired with their publication event id.
+        The stalls are treated as immutable: assign an updated stall_db
+        instead of changing them in place so that get_stalls() stays current.
+        """
+        return list(zip(self._stalls, self._stall_event_ids))
+
+    @stall_db.setter
+    def stall_db(self, stall_db: List[Tuple[Stall, Optional[str]]]) -> None:
+        self._stalls = [stall for stall, _ in stall_db]
+        self._stall_event_ids = [event_id for _, event_id in stall_db]
+        self._reindex()
+
     @classmethod
     async def create(
         cls,
@@ -145,7 +246,10 @@ class MerchantTools(Toolkit):
         if self.profile is None:
             raise ValueError("Profile not initialized. Please use create() method.")
 
-        return json.dumps(self.profile.to_json())
+        if self._profile_json is None:
+            # to_json() already returns a JSON object, don't encode it again
+            self._profile_json = self.profile.to_json()
+        return self._profile_json
 
     def get_products(self) -> str:
         """
@@ -154,7 +258,9 @@ class MerchantTools(Toolkit):
         Returns:
             str: JSON string containing all products
         """
-        return json.dumps([p.to_dict() for p, _ in self.product_db])
+        if self._products_json is None:
+            self._products_json = _dumps([p.to_dict() for p in self._products])
+        return self._products_json
 
     def get_relay(self) -> str:
         """
@@ -181,7 +287,9 @@ class MerchantTools(Toolkit):
         Returns:
             str: JSON string containing all stalls
         """
-        return json.dumps([s.to_dict() for s, _ in self.stall_db])
+        if self._stalls_json is None:
+            self._stalls_json = _dumps([s.to_dict() for s in self._stalls])
+        return self._stalls_json
 
     async def async_listen_for_orders(self, timeout: int = 5) -> str:
         """
@@ -213,11 +321,11 @@ class MerchantTools(Toolkit):
 
         try:
             message = await self.nostr_client.async_receive_message(timeout)
-            message_dict = json.loads(message)
+            message_dict = _loads(message)
             message_kind = message_dict.get("type")
             if message_kind in ("kind:4", "kind:14"):
                 if self._message_is_order(message_dict.get("content")):
-                    return json.dumps(
+                    return _dumps(
                         {
                             "type": "order",
                             "kind": message_kind,
@@ -225,7 +333,7 @@ class MerchantTools(Toolkit):
                             "content": message_dict.get("content"),
                         }
                     )
-            return json.dumps(
+            return _dumps(
                 {
                     "type": "none",
                     "kind": "none",
@@ -249,7 +357,7 @@ class MerchantTools(Toolkit):
         Returns:
             str: JSON string of the payment request
         """
-        return json.dumps(
+        return _dumps(
             {
                 "status": "success",
                 "message": f"Workflow triggered for order: {order} from {buyer} with parameters: {parameters}",
@@ -257,14 +365,19 @@ class MerchantTools(Toolkit):
         )
 
     async def async_send_payment_request(
-        self, buyer: str, order: str, kind: str, payment_type: str, payment_url: str
+        self,
+        buyer: str,
+        order: Union[str, Dict[str, Any]],
+        kind: str,
+        payment_type: str,
+        payment_url: str,
     ) -> str:
         """
         Processes an order
 
         Args:
             buyer: buyer bech32 public key
-            order: JSON string of the order
+            order: JSON string of the order, or the decoded order
             kind: message kind to use (kind:4 or kind:14)
             payment_type: Type of payment
             payment_url: URL of the payment
@@ -276,16 +389,20 @@ class MerchantTools(Toolkit):
             logger.error("NostrClient not initialized. Please use create() method.")
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
-        logger.info("process_order: Processing order: %s", order)
+        # agno's logger takes (msg, center, symbol) positionally, so format
+        # the message only when it will be emitted
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"process_order: Processing order: {order}")
         try:
-            order_dict = json.loads(order)
+            # the agent may hand the order over already decoded
+            order_dict = order if isinstance(order, dict) else _loads(order)
         except json.JSONDecodeError:
-            return json.dumps({"status": "error", "message": "Invalid order format"})
+            return _dumps({"status": "error", "message": "Invalid order format"})
         order_id = order_dict.get("id")
 
         is_valid_payment_type = payment_type in ["URL", "BTC", "LN", "LNURL"]
         if not is_valid_payment_type:
-            return json.dumps({"status": "error", "message": "Invalid payment type"})
+            return _dumps({"status": "error", "message": "Invalid payment type"})
 
         payment_request = self._create_payment_request(
             order_id, payment_type, payment_url
@@ -295,7 +412,7 @@ class MerchantTools(Toolkit):
             buyer,
             payment_request,
         )
-        return json.dumps(response)
+        return _dumps(response)
 
     async def async_publish_product(self, product_name: str) -> str:
         """
@@ -315,48 +432,12 @@ class MerchantTools(Toolkit):
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
         # let's find the product
-        product = next((p for p, _ in self.product_db if p.name == product_name), None)
-        if product is None:
-            return json.dumps(
+        index = self._product_index.get(product_name)
+        if index is None:
+            return _dumps(
                 {"status": "error", "message": f"Product {product_name} not found"}
             )
-
-        try:
-            event_id = await self.nostr_client.async_set_product(product)
-            if product not in self.product_db:
-                # we need to add the product event id to the product db
-                self.product_db.append((product, event_id))
-            else:
-                # we need to update the product event id in the product db
-                self.product_db[self.product_db.index((product, None))] = (
-                    product,
-                    event_id,
-                )
-            return json.dumps(
-                {
-                    "status": "success",
-                    "event_id": str(event_id),
-                    "product_name": product.name,
-                }
-            )
-        except RuntimeError as e:
-            logger.error(
-                "Failed to publish product '%s' (ID: %s): %s",
-                product.name,
-                product.id,
-                str(e),
-            )
-            # Include more useful information in the error response
-            return json.dumps(
-                {
-                    "status": "error",
-                    "message": str(e),
-                    "product_name": product.name,
-                    "product_id": product.id,
-                    "stall_id": product.stall_id,
-                    "details": "Relay may be unreachable or rejecting this product format",
-                }
-            )
+        return _dumps(await self._async_publish_product(self._products[index]))
 
     async def async_publish_products(
         self,
@@ -382,36 +463,39 @@ class MerchantTools(Toolkit):
             logger.error("NostrClient not initialized. Please use create() method.")
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
-        results = []
+        # match on ids so filtering doesn't run a model comparison per entry
+        product_ids = None if products is None else {p.id for p in products}
+        selected = [
+            i
+            for i in self._product_positions(stall)
+            if product_ids is None or self._products[i].id in product_ids
+        ]
 
-        for i, (product, _) in enumerate(self.product_db):
-            if stall is not None and product.stall_id != stall.id:
-                continue
-            if products is not None and product not in products:
-                continue
-            try:
-                event_id = await self.nostr_client.async_set_product(product)
-                logger.debug(
-                    f"Published product {product.name} with categories {', '.join(product.categories)}"
-                )
+        # Publish the selected products concurrently instead of one relay
+        # round-trip at a time, without exceeding the relay's rate limit
+        to_publish = [self._products[i] for i in selected]
+        semaphore = asyncio.Semaphore(PUBLISH_CONCURRENCY)
 
-                self.product_db[i] = (product, event_id)
-                results.append(
-                    {
-                        "status": "success",
-                        "event_id": str(event_id),
-                        "product_name": product.name,
-                    }
-                )
-                # Pause for 1 seconds to rate limiting by relay
-                time.sleep(1)
-            except RuntimeError as e:
-                logger.error("Unable to publish product %s. Error %s", product, e)
-                results.append(
-                    {"status": "error", "message": str(e), "product_name": product.name}
-                )
+        async def publish(product: Product) -> Dict[str, str]:
+            async with semaphore:
+                result = await self._async_publish_product(product)
+                await asyncio.sleep(PUBLISH_INTERVAL)
+                return result
 
-        return json.dumps(results)
+        outcomes = await asyncio.gather(
+            *[publish(product) for product in to_publish], return_exceptions=True
+        )
+        results = []
+        for product, outcome in zip(to_publish, outcomes):
+            # only RuntimeError is an expected publish failure; anything else
+            # is a bug and must not be reported as an unreachable relay
+            if isinstance(outcome, RuntimeError):
+                results.append(self._product_publish_error(product, outcome))
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.append(outcome)
+        return _dumps(results)
 
     async def async_publish_stall(self, stall_name: str) -> str:
         """
@@ -436,32 +520,12 @@ class MerchantTools(Toolkit):
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
         # let's find the stall
-        stall = next((s for s, _ in self.stall_db if s.name == stall_name), None)
-        if stall is None:
-            return json.dumps(
+        index = self._stall_index.get(stall_name)
+        if index is None:
+            return _dumps(
                 {"status": "error", "message": f"Stall {stall_name} not found"}
             )
-
-        try:
-            event_id = await self.nostr_client.async_set_stall(stall)
-            if stall not in self.stall_db:
-                # we need to add the stall event id to the stall db
-                self.stall_db.append((stall, event_id))
-            else:
-                # we need to update the stall event id in the stall db
-                self.stall_db[self.stall_db.index((stall, None))] = (stall, event_id)
-            return json.dumps(
-                {
-                    "status": "success",
-                    "event_id": str(event_id),
-                    "stall_name": stall.name,
-                }
-            )
-        except RuntimeError as e:
-            logger.error("Unable to publish the stall: %s", e)
-            return json.dumps(
-                {"status": "error", "message": str(e), "stall_name": stall.name}
-            )
+        return _dumps(await self._async_publish_stall(self._stalls[index]))
 
     async def async_publish_stalls(
         self,
@@ -484,37 +548,154 @@ class MerchantTools(Toolkit):
             logger.error("NostrClient not initialized. Please use create() method.")
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
+        stall_ids = None if stalls is None else {s.id for s in stalls}
+        selected = [
+            i
+            for i, stall in enumerate(self._stalls)
+            if stall_ids is None or stall.id in stall_ids
+        ]
+
+        to_publish = [self._stalls[i] for i in selected]
+        semaphore = asyncio.Semaphore(PUBLISH_CONCURRENCY)
+
+        async def publish(stall: Stall) -> Dict[str, str]:
+            async with semaphore:
+                result = await self._async_publish_stall(stall)
+                await asyncio.sleep(PUBLISH_INTERVAL)
+                return result
+
+        outcomes = await asyncio.gather(
+            *[publish(stall) for stall in to_publish], return_exceptions=True
+        )
         results = []
+        for stall, outcome in zip(to_publish, outcomes):
+            # only RuntimeError is an expected publish failure; anything else
+            # is a bug and must not be reported as an unreachable relay
+            if isinstance(outcome, RuntimeError):
+                results.append(self._stall_publish_error(stall, outcome))
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.append(outcome)
+        return _dumps(results)
 
-        for i, (stall, _) in enumerate(self.stall_db):
-            if stalls is not None and stall not in stalls:
-                continue
-            try:
-                event_id = await self.nostr_client.async_set_stall(stall)
-                self.stall_db[i] = (stall, event_id)
-                results.append(
-                    {
-                        "status": "success",
-                        "event_id": str(event_id),
-                        "stall_name": stall.name,
-                    }
-                )
-                # Pause for 0.5 seconds to avoid rate limiting
-                time.sleep(0.5)
-            except RuntimeError as e:
-                logger.error("Unable to publish stall %s. Error %s", stall, e)
-                results.append(
-                    {"status": "error", "message": str(e), "stall_name": stall.name}
-                )
+    async def _async_publish_product(self, product: Product) -> Dict[str, str]:
+        """
+        Publishes a product to Nostr and records the id of the publishing
+        event in the product database.
+        Shared by async_publish_product() and async_publish_products().
+
+        Args:
+            product: product to publish
+
+        Returns:
+            Dict[str, str]: status of the operation
+        """
+        if self.nostr_client is None:
+            raise ValueError("NostrClient not initialized. Please use create() method.")
+
+        try:
+            event_id = await self.nostr_client.async_set_product(product)
+        except RuntimeError as e:
+            return self._product_publish_error(product, e)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Published product {product.name} with categories {', '.join(product.categories)}"
+            )
+        # update the product event id in the product db; look the product up
+        # again, the database may have changed while publishing
+        index = self._product_id_index.get(product.id)
+        if index is not None:
+            self._product_event_ids[index] = event_id
+        return {
+            "status": "success",
+            "event_id": str(event_id),
+            "product_name": product.name,
+        }
+
+    async def _async_publish_stall(self, stall: Stall) -> Dict[str, str]:
+        """
+        Publishes a stall to Nostr and records the id of the publishing
+        event in the stall database.
+        Shared by async_publish_stall() and async_publish_stalls().
+
+        Args:
+            stall: stall to publish
+
+        Returns:
+            Dict[str, str]: status of the operation
+        """
+        if self.nostr_client is None:
+            raise ValueError("NostrClient not initialized. Please use create() method.")
+
+        try:
+            event_id = await self.nostr_client.async_set_stall(stall)
+        except RuntimeError as e:
+            return self._stall_publish_error(stall, e)
+
+        # update the stall event id in the stall db; look the stall up again,
+        # the database may have changed while publishing
+        index = self._stall_id_index.get(stall.id)
+        if index is not None:
+            self._stall_event_ids[index] = event_id
+        return {
+            "status": "success",
+            "event_id": str(event_id),
+            "stall_name": stall.name,
+        }
+
+    @staticmethod
+    def _product_publish_error(product: Product, error: RuntimeError) -> Dict[str, str]:
+        """
+        Logs a failed product publication and builds its error entry.
+
+        Args:
+            product: product that could not be published
+            error: exception raised while publishing
 
-        return json.dumps(results)
+        Returns:
+            Dict[str, str]: status of the operation
+        """
+        logger.error(
+            "Failed to publish product '%s' (ID: %s): %s",
+            product.name,
+            product.id,
+            str(error),
+        )
+        # Include more useful information in the error response
+        return {
+            "status": "error",
+            "message": str(error),
+            "product_name": product.name,
+            "product_id": product.id,
+            "stall_id": product.stall_id,
+            "details": "Relay may be unreachable or rejecting this product format",
+        }
+
+    @staticmethod
+    def _stall_publish_error(stall: Stall, error: RuntimeError) -> Dict[str, str]:
+        """
+        Logs a failed stall publication and builds its error entry.
+
+        Args:
+            stall: stall that could not be published
+            error: exception raised while publishing
+
+        Returns:
+            Dict[str, str]: status of the operation
+        """
+        logger.error("Unable to publish stall %s. Error %s", stall.name, error)
+        return {"status": "error", "message": str(error), "stall_name": stall.name}
 
     async def async_set_products(self, products: List[Product]) -> str:
         """
         Sets the products used by the Toolkit.
         The products are also published to the Nostr network.
         """
-        self.product_db = [(product, None) for product in products]
+        self._products = list(products)
+        self._product_event_ids = [None] * len(self._products)
+        self._reindex()
         return await self.async_publish_products()
 
     async def async_set_profile(self, profile: Profile) -> str:
@@ -533,17 +714,22 @@ class MerchantTools(Toolkit):
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
         try:
-            return await self.nostr_client.async_set_profile(profile)
+            event_id = await self.nostr_client.async_set_profile(profile)
         except RuntimeError as e:
             logger.error("Unable to publish the profile: %s", e)
             raise RuntimeError(f"Unable to publish the profile: {e}") from e
 
+        self.profile = profile
+        return event_id
+
     async def async_set_stalls(self, stalls: List[Stall]) -> str:
         """
         Sets the stalls used by the Toolkit.
         The stalls are also published to the Nostr network.
         """
-        self.stall_db = [(stall, None) for stall in stalls]
+        self._stalls = list(stalls)
+        self._stall_event_ids = [None] * len(self._stalls)
+        self._reindex()
         return await self.async_publish_stalls()
 
     async def async_remove_products(
@@ -569,18 +755,42 @@ class MerchantTools(Toolkit):
             logger.error("NostrClient not initialized. Please use create() method.")
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
-        results = []
+        return _dumps(await self._async_remove_products(stall, products))
 
-        for product, event_id in self.product_db:
-            if stall is not None and product.stall_id != stall.id:
-                continue
-            if products is not None and product not in products:
+    async def _async_remove_products(
+        self,
+        stall: Optional[Stall] = None,
+        products: Optional[List[Product]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Removes products from Nostr and the internal database.
+        Shared by async_remove_products() and async_remove_stalls() so the
+        results don't have to go through a JSON encode/decode round-trip.
+
+        Args:
+            stall: Optional remove only products for a given stall
+            products: Optional subset of products to remove
+
+        Returns:
+            List[Dict[str, str]]: status of each product removal operation
+        """
+        if self.nostr_client is None:
+            raise ValueError("NostrClient not initialized. Please use create() method.")
+
+        results: List[Dict[str, str]] = []
+        removed: Set[int] = set()
+        product_ids = None if products is None else {p.id for p in products}
+
+        for i in self._product_positions(stall):
+            product = self._products[i]
+            event_id = self._product_event_ids[i]
+            if product_ids is not None and product.id not in product_ids:
                 continue
 
             if event_id is None:
                 # product has not been published to Nostr
                 # remove from database and call it a success
-                self.product_db.remove((product, event_id))
+                removed.add(i)
                 results.append(
                     {
                         "status": "success",
@@ -600,7 +810,7 @@ class MerchantTools(Toolkit):
                 delete_event_id = await self.nostr_client.async_delete_event(
                     event_id, reason=f"Product '{product.name}' removed"
                 )
-                self.product_db.remove((product, event_id))
+                removed.add(i)
                 results.append(
                     {
                         "status": "success",
@@ -610,14 +820,22 @@ class MerchantTools(Toolkit):
                     }
                 )
                 # Pause for 0.5 seconds to avoid rate limiting
-                time.sleep(0.5)
+                await asyncio.sleep(0.5)
             except RuntimeError as e:
-                logger.error("Unable to remove product %s. Error %s", product, e)
+                logger.error("Unable to remove product %s. Error %s", product.name, e)
                 results.append(
                     {"status": "error", "message": str(e), "product_name": product.name}
                 )
 
-        return json.dumps(results)
+        if removed:
+            self._products = [
+                p for i, p in enumerate(self._products) if i not in removed
+            ]
+            self._product_event_ids = [
+                e for i, e in enumerate(self._product_event_ids) if i not in removed
+            ]
+            self._reindex()
+        return results
 
     async def async_remove_stalls(
         self,
@@ -643,23 +861,22 @@ class MerchantTools(Toolkit):
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
         results: list[dict[str, str]] = []
+        removed: Set[int] = set()
+        stall_ids = None if stalls is None else {s.id for s in stalls}
 
-        for stall, event_id in self.stall_db:
-            if stalls is not None and stall not in stalls:
+        for i, stall in enumerate(self._stalls):
+            if stall_ids is not None and stall.id not in stall_ids:
                 continue  # we're filtering out the stalls that are not in the list
 
             # remove all products in this stall
-            product_results = json.loads(
-                await self.async_remove_products(stall=stall, products=None)
-            )
-            results.extend(product_results)
+            results.extend(await self._async_remove_products(stall=stall))
 
             # now remove the stall
             try:
                 delete_event_id = await self.nostr_client.async_delete_event(
                     stall.id, reason=f"Stall '{stall.name}' removed"
                 )
-                self.stall_db.remove((stall, event_id))
+                removed.add(i)
                 results.append(
                     {
                         "status": "success",
@@ -670,14 +887,20 @@ class MerchantTools(Toolkit):
                 )
 
                 # Pause for 0.5 seconds to avoid rate limiting
-                time.sleep(0.5)
+                await asyncio.sleep(0.5)
             except RuntimeError as e:
                 logger.error("Unable to remove stall %s. Error %s", stall.name, e)
                 results.append(
                     {"status": "error", "message": str(e), "stall_name": stall.name}
                 )
 
-        return json.dumps(results)
+        if removed:
+            self._stalls = [s for i, s in enumerate(self._stalls) if i not in removed]
+            self._stall_event_ids = [
+                e for i, e in enumerate(self._stall_event_ids) if i not in removed
+            ]
+            self._reindex()
+        return _dumps(results)
 
     def verify_payment(
         self,
@@ -692,7 +915,7 @@ class MerchantTools(Toolkit):
         Assumes that payment has already been received
         Sends a payment verification to the buyer
         """
-        return json.dumps(
+        return _dumps(
             {
                 "status": "success",
                 "message": "Payment verified",
@@ -700,7 +923,7 @@ class MerchantTools(Toolkit):
         )
 
     async def async_send_payment_verification(
-        self, buyer: str, order: str, kind: str
+        self, buyer: str, order: Union[str, Dict[str, Any]], kind: str
     ) -> str:
         """
         Verifies that payment has been received for an order
@@ -711,7 +934,7 @@ class MerchantTools(Toolkit):
 
         Args:
             buyer: Bech32 public key of the buyer
-            order: JSON string of the order
+            order: JSON string of the order, or the decoded order
             kind: message kind to use (kind:4 or kind:14)
 
         Returns:
@@ -721,14 +944,15 @@ class MerchantTools(Toolkit):
             logger.error("NostrClient not initialized. Please use create() method.")
             raise ValueError("NostrClient not initialized. Please use create() method.")
 
-        logger.info(
-            "send_payment_verification: Sending payment verification for order: %s",
-            order,
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                f"send_payment_verification: Sending payment verification for order: {order}"
+            )
         try:
-            order_dict = json.loads(order)
+            # the agent may hand the order over already decoded
+            order_dict = order if isinstance(order, dict) else _loads(order)
         except json.JSONDecodeError:
-            return json.dumps({"status": "error", "message": "Invalid order format"})
+            return _dumps({"status": "error", "message": "Invalid order format"})
         order_id = order_dict.get("id")
 
         payment_verification = self._create_payment_verification(order_id)
@@ -737,7 +961,47 @@ class MerchantTools(Toolkit):
             buyer,
             payment_verification,
         )
-        return json.dumps(response)
+        return _dumps(response)
+
+    def _reindex(self) -> None:
+        """
+        Rebuild the name lookup indexes for the product and stall databases
+        and drop the cached serialized products and stalls.
+        Must be called whenever entries are added to or removed from
+        product_db or stall_db.
+        """
+        self._products_json = None
+        self._stalls_json = None
+
+        self._product_index = {}
+        self._product_id_index = {}
+        for i, product in enumerate(self._products):
+            self._product_index.setdefault(product.name, i)
+            self._product_id_index.setdefault(product.id, i)
+
+        self._products_by_stall = {}
+        for i, product in enumerate(self._products):
+            self._products_by_stall.setdefault(product.stall_id, []).append(i)
+
+        self._stall_index = {}
+        self._stall_id_index = {}
+        for i, stall in enumerate(self._stalls):
+            self._stall_index.setdefault(stall.name, i)
+            self._stall_id_index.setdefault(stall.id, i)
+
+    def _product_positions(self, stall: Optional[Stall] = None) -> List[int]:
+        """
+        Positions in the product database of the products in a stall.
+
+        Args:
+            stall: Optional stall to filter on; all products if None
+
+        Returns:
+            List[int]: product positions in database order
+        """
+        if stall is None:
+            return list(range(len(self._products)))
+        return self._products_by_stall.get(stall.id, [])
 
     def _message_is_order(self, message: str) -> bool:
         """
@@ -754,9 +1018,10 @@ class MerchantTools(Toolkit):
             if isinstance(message, dict):
                 content = message
             else:
-                content = json.loads(message)
+                content = _loads(message)
 
-            logger.debug("_message_is_order: content: %s", content)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"_message_is_order: content: {content}")
 
             if content.get("type") != 0:
                 return False
@@ -1,23 +1,38 @@
-from typing import ClassVar, List, Optional, Set, Tuple, Union
-
-from pydantic import ConfigDict
+from typing import Any, ClassVar, Dict, List, Optional, Set, Tuple, Union
 
 from agno.tools import Toolkit
 from synvya_sdk import NostrClient, Product, Profile, Stall
 
+HAS_ORJSON: bool
+
+def _dumps(obj: Any) -> str: ...
+def _loads(data: Union[str, bytes]) -> Any: ...
+
+PUBLISH_CONCURRENCY: int
+PUBLISH_INTERVAL: float
+
 class MerchantTools(Toolkit):
     # Class variables
     _instances_from_create: ClassVar[Set[int]]
-    model_config: ClassVar[ConfigDict]
 
     # Instance variables
     relays: List[str]
     private_key: str
-    profile: Optional[Profile]
     nostr_client: Optional[NostrClient]
-    product_db: List[Tuple[Product, Optional[str]]]
-    stall_db: List[Tuple[Stall, Optional[str]]]
     _instance_id: int
+    _stalls: List[Stall]
+    _stall_event_ids: List[Optional[str]]
+    _products: List[Product]
+    _product_event_ids: List[Optional[str]]
+    _product_index: Dict[str, int]
+    _stall_index: Dict[str, int]
+    _product_id_index: Dict[str, int]
+    _stall_id_index: Dict[str, int]
+    _products_by_stall: Dict[str, List[int]]
+    _profile: Optional[Profile]
+    _products_json: Optional[str]
+    _stalls_json: Optional[str]
+    _profile_json: Optional[str]
 
     # Initialization
     def __init__(
@@ -29,6 +44,18 @@ class MerchantTools(Toolkit):
         _from_create: bool = False,
     ) -> None: ...
     def __del__(self) -> None: ...
+    @property
+    def profile(self) -> Optional[Profile]: ...
+    @profile.setter
+    def profile(self, profile: Optional[Profile]) -> None: ...
+    @property
+    def product_db(self) -> List[Tuple[Product, Optional[str]]]: ...
+    @product_db.setter
+    def product_db(self, product_db: List[Tuple[Product, Optional[str]]]) -> None: ...
+    @property
+    def stall_db(self) -> List[Tuple[Stall, Optional[str]]]: ...
+    @stall_db.setter
+    def stall_db(self, stall_db: List[Tuple[Stall, Optional[str]]]) -> None: ...
     @classmethod
     async def create(
         cls,
@@ -62,10 +89,15 @@ class MerchantTools(Toolkit):
     async def async_listen_for_orders(self, timeout: int = 5) -> str: ...
     def manual_order_workflow(self, buyer: str, order: str, parameters: str) -> str: ...
     async def async_send_payment_request(
-        self, buyer: str, order: str, kind: str, payment_type: str, payment_url: str
+        self,
+        buyer: str,
+        order: Union[str, Dict[str, Any]],
+        kind: str,
+        payment_type: str,
+        payment_url: str,
     ) -> str: ...
     async def async_send_payment_verification(
-        self, buyer: str, order: str, kind: str
+        self, buyer: str, order: Union[str, Dict[str, Any]], kind: str
     ) -> str: ...
     def verify_payment(
         self,
@@ -82,6 +114,19 @@ class MerchantTools(Toolkit):
     async def async_set_stalls(self, stalls: List[Stall]) -> str: ...
 
     # Internal methods
+    def _reindex(self) -> None: ...
+    def _product_positions(self, stall: Optional[Stall] = None) -> List[int]: ...
+    async def _async_publish_product(self, product: Product) -> Dict[str, str]: ...
+    async def _async_publish_stall(self, stall: Stall) -> Dict[str, str]: ...
+    @staticmethod
+    def _product_publish_error(
+        product: Product, error: RuntimeError
+    ) -> Dict[str, str]: ...
+    @staticmethod
+    def _stall_publish_error(stall: Stall, error: RuntimeError) -> Dict[str, str]: ...
+    async def _async_remove_products(
+        self, stall: Optional[Stall] = None, products: Optional[List[Product]] = None
+    ) -> List[Dict[str, str]]: ...
     def _message_is_order(self, message: str) -> bool: ...
     def _create_payment_request(
         self,
@@ -1,13 +1,15 @@
 import json
 import logging
 import re
+import ssl
 import warnings
-from datetime import datetime, timezone
 from enum import Enum
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import ClassVar, Dict, List, Literal, Optional, Set, Tuple, Union
 
 import httpx
+import phonenumbers
+import pygeohash as pgh
 from nostr_sdk import (
     Alphabet,
     Event,
@@ -24,6 +26,7 @@ from nostr_sdk import (
     Tag,
     TagKind,
 )
+from phonenumbers import NumberParseException
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -59,6 +62,37 @@ def deprecated(reason: str, version: str = "2.0.0", alternative: str = None):
     return decorator
 
 
+@lru_cache(maxsize=4096)
+def _parse_public_key(public_key: str) -> Tuple[str, str]:
+    """
+    Parse a public key once and memoize both of its encodings.
+
+    Args:
+        public_key: public key in hex or bech32 format
+
+    Returns:
+        Tuple[str, str]: (hex, bech32) encodings of the public key
+
+    Raises:
+        NostrSdkError: if the public key is invalid (failures are not cached)
+    """
+    parsed = PublicKey.parse(public_key)
+    return parsed.to_hex(), parsed.to_bech32()
+
+
+@lru_cache(maxsize=1)
+def _http_ssl_context() -> ssl.SSLContext:
+    """
+    SSL context shared by the HTTP clients used for NIP-05 lookups.
+    Loading the CA bundle dominates the cost of creating an httpx client,
+    so it is built once and reused instead of once per request.
+
+    Returns:
+        ssl.SSLContext: default httpx SSL context
+    """
+    return httpx.create_ssl_context()
+
+
 class KeyEncoding(str, Enum):
     """
     Enum representing the valid encoding formats for public or private keys.
@@ -175,21 +209,19 @@ class ProfileFilter(BaseModel):
         super().__init__(
             namespace=namespace_str, label=label_str, hashtags=normalized_hashtags
         )
-        self.hashtags = normalized_hashtags
 
     def to_json(self) -> str:
         """
         Convert the ProfileFilter to a JSON string.
         """
-        return json.dumps(self.model_dump())
+        return self.model_dump_json()
 
     @classmethod
     def from_json(cls, json_str: str) -> "ProfileFilter":
         """
         Create a ProfileFilter instance from a JSON string.
         """
-        data = json.loads(json_str)
-        return cls.model_validate(data)
+        return cls.model_validate_json(json_str)
 
     @staticmethod
     def _normalize_hashtag(tag: str) -> str:
@@ -247,7 +279,7 @@ class Profile(BaseModel):
         Returns:
             None
         """
-        public_key = PublicKey.parse(public_key).to_hex()
+        public_key = _parse_public_key(public_key)[0]
         super().__init__(public_key=public_key, **data)
         self.profile_url = self.PROFILE_URL_PREFIX + public_key
 
@@ -460,9 +492,9 @@ class Profile(BaseModel):
             ValueError: if the encoding is not 'bech32' or 'hex'
         """
         if encoding == KeyEncoding.BECH32:
-            return PublicKey.parse(self.public_key).to_bech32()
+            return _parse_public_key(self.public_key)[1]
         if encoding == KeyEncoding.HEX:
-            return PublicKey.parse(self.public_key).to_hex()
+            return _parse_public_key(self.public_key)[0]
 
         raise ValueError("Invalid encoding. Must be 'bech32' or 'hex'.")
 
@@ -581,9 +613,6 @@ class Profile(BaseModel):
 
         # Try to convert to E.164 format using phonenumbers library
         try:
-            import phonenumbers
-            from phonenumbers import NumberParseException
-
             # If phone already starts with +, assume it's already in E.164 or close
             if phone_without_ext.startswith("+"):
                 parsed = phonenumbers.parse(phone_without_ext, None)
@@ -604,12 +633,6 @@ class Profile(BaseModel):
                 self.phone = f"{e164_number};ext={extension}"
             else:
                 self.phone = e164_number
-        except ImportError:
-            # phonenumbers library not available, store as-is
-            self.logger.warning(
-                "phonenumbers library not available. Phone number stored as-is without E.164 conversion."
-            )
-            self.phone = phone
         except NumberParseException:
             # Failed to parse phone number, store as-is
             self.logger.warning(
@@ -673,36 +696,7 @@ class Profile(BaseModel):
         }
 
     def to_json(self) -> str:
-        data = {
-            "about": self.about,
-            "banner": self.banner,
-            "bot": self.bot,
-            "city": self.city,
-            "country": self.country,
-            "created_at": self.created_at,
-            "display_name": self.display_name,
-            "environment": self.environment,
-            "email": self.email,
-            "external_identities": self.external_identities,
-            "geohash": self.geohash,
-            "hashtags": self.hashtags,
-            "locations": (list(self.locations) if self.locations else []),
-            "name": self.name,
-            "namespaces": list(
-                self.labels.keys()
-            ),  # Derived from labels for backward compatibility
-            "labels": self.labels,
-            "nip05": self.nip05,
-            "picture": self.picture,
-            "phone": self.phone,
-            "profile_url": self.profile_url,
-            "public_key": self.public_key,
-            "state": self.state,
-            "street": self.street,
-            "website": self.website,
-            "zip_code": self.zip_code,
-        }
-        return json.dumps(data)
+        return json.dumps(self.to_dict())
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Profile):
@@ -732,7 +726,7 @@ class Profile(BaseModel):
         url = f"https://{domain}/.well-known/nostr.json?name={name}"
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(verify=_http_ssl_context()) as client:
                 response = await client.get(url)
                 response.raise_for_status()  # Raise an error for bad responses
                 return response.json()
@@ -985,15 +979,8 @@ class Profile(BaseModel):
         # Priority 2: If no geohash found, calculate from latitude/longitude
         if not geohash_found and latitude is not None and longitude is not None:
             try:
-                import pygeohash as pgh
-
                 calculated_geohash = pgh.encode(latitude, longitude)
                 profile.set_geohash(calculated_geohash)
-            except ImportError:
-                # pygeohash not available, cannot calculate geohash
-                profile.logger.warning(
-                    "pygeohash library not available. Cannot calculate geohash from latitude/longitude."
-                )
             except Exception as e:
                 profile.logger.warning(
                     "Failed to calculate geohash from latitude/longitude: %s", e
@@ -1369,7 +1356,7 @@ class ClassifiedListing(BaseModel):
     seller: str = ""  # hex format
 
     def set_seller(self, seller: str) -> None:
-        self.seller = PublicKey.parse(seller).to_hex()
+        self.seller = _parse_public_key(seller)[0]
 
     def get_seller(self) -> str:
         return self.seller
@@ -1642,8 +1629,6 @@ class ProductShippingCost(BaseModel):
 
     def __init__(self, psc_id: str, psc_cost: float) -> None:
         super().__init__(psc_id=psc_id, psc_cost=psc_cost)
-        self.psc_id = psc_id
-        self.psc_cost = psc_cost
 
     def get_id(self) -> str:
         return self.psc_id
@@ -1691,10 +1676,6 @@ class StallShippingMethod(BaseModel):
             ssm_name=ssm_name,
             ssm_regions=ssm_regions if ssm_regions is not None else [],
         )
-        self.ssm_id = ssm_id
-        self.ssm_cost = ssm_cost
-        self.ssm_name = ssm_name
-        self.ssm_regions = ssm_regions if ssm_regions is not None else []
 
     def get_id(self) -> str:
         return self.ssm_id
@@ -1,3 +1,4 @@
+import ssl
 from enum import Enum
 from functools import wraps
 from logging import Logger
@@ -20,6 +21,8 @@ from pydantic import BaseModel, ConfigDict, Field
 def deprecated(
     reason: str, version: str = "2.0.0", alternative: Optional[str] = None
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]: ...
+def _parse_public_key(public_key: str) -> Tuple[str, str]: ...
+def _http_ssl_context() -> ssl.SSLContext: ...
 
 class KeyEncoding(str, Enum):
     """
@@ -6,18 +6,19 @@ import asyncio
 import hashlib
 import json
 import logging
+import threading
 from datetime import timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Coroutine, Dict, List, Optional, Tuple, TypeVar, Union
 
 import coincurve
+import pygeohash as pgh
 import requests
 
 from .models import (
     ClassifiedListing,
     Collection,
     KeyEncoding,
-    Namespace,
     NostrKeys,
     Product,
     Profile,
@@ -61,6 +62,67 @@ except ImportError as exc:
     ) from exc
 
 
+T = TypeVar("T")
+
+# Event loop shared by the synchronous wrappers, running in a daemon thread.
+# Reusing one loop avoids creating and tearing down a loop on every call.
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion on the shared background event loop.
+    Used by the synchronous wrappers of the NostrClient async methods.
+
+    Args:
+        coro: coroutine to run
+
+    Returns:
+        T: result of the coroutine
+
+    Raises:
+        RuntimeError: if called from a thread with a running event loop; use
+            the async_* methods there instead
+    """
+    global _sync_loop  # pylint: disable=global-statement
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        # Blocking here would stall the caller's loop for the whole relay
+        # round-trip, and deadlock when called from the background loop itself
+        coro.close()
+        raise RuntimeError(
+            "NostrClient synchronous methods cannot be called from a running "
+            "event loop; await the async_* methods instead"
+        )
+
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_sync_loop.run_forever,
+                name="NostrClientSyncLoop",
+                daemon=True,
+            ).start()
+
+    return asyncio.run_coroutine_threadsafe(coro, _sync_loop).result()
+
+
+# Set log handling once at import time instead of on every NostrClient()
+_nostr_client_logger = logging.getLogger("NostrClient")
+if not _nostr_client_logger.hasHandlers():
+    _console_handler = logging.StreamHandler()
+    _console_handler.setLevel(logging.INFO)
+    _console_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    _nostr_client_logger.addHandler(_console_handler)
+
+
 class NostrClient:
     """
     NostrClient implements the set of Nostr utilities required for
@@ -70,7 +132,19 @@ class NostrClient:
     factory method `create`.
     """
 
-    logger = logging.getLogger("NostrClient")
+    __slots__ = (
+        "_instance_id",
+        "relays",
+        "keys",
+        "_public_key",
+        "nostr_signer",
+        "client",
+        "connected",
+        "_connect_lock",
+        "profile",
+    )
+
+    logger = _nostr_client_logger
     _instances_from_create: set[int] = set()
 
     # ----------------------------------------------------------------
@@ -108,21 +182,15 @@ class NostrClient:
         # self.delegations: Dict[str, Delegation] = {}
 
         self.keys: Keys = Keys.parse(private_key)
+        # Derived once; Keys.public_key() builds a new object on every call
+        self._public_key: PublicKey = self.keys.public_key()
         self.nostr_signer: NostrSigner = NostrSigner.keys(self.keys)
         self.client: Client = Client(self.nostr_signer)
         self.connected: bool = False
+        # Serializes connection setup so concurrent calls share one connection
+        self._connect_lock: asyncio.Lock = asyncio.Lock()
         self.profile: Optional[Profile] = None  # Initialized asynchronously
 
-        # Set log handling
-        if not NostrClient.logger.hasHandlers():
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.INFO)
-            formatter = logging.Formatter(
-                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            )
-            console_handler.setFormatter(formatter)
-            NostrClient.logger.addHandler(console_handler)
-
     def __del__(self) -> None:
         """
         Delete the NostrClient instance.
@@ -149,15 +217,14 @@ class NostrClient:
             NostrClient: An initialized NostrClient instance
         """
         instance = cls(relays, private_key, _from_create=True)
+        public_key = instance._public_key.to_bech32()
 
         try:
             # Try to download the profile from the relay if it already exists
-            instance.profile = await instance.async_get_profile(
-                instance.keys.public_key().to_bech32()
-            )
+            instance.profile = await instance.async_get_profile(public_key)
         except ValueError:
             # If the profile doesn't exist, create a new one
-            instance.profile = Profile(instance.keys.public_key().to_bech32())
+            instance.profile = Profile(public_key)
         except Exception as e:
             raise RuntimeError(f"Unable to complete async initialization: {e}") from e
 
@@ -195,15 +262,18 @@ class NostrClient:
         event_builder = EventBuilder.delete(event_deletion_request)
 
         # return_event_id_obj = await self._async_publish_event(event_builder)
+        if not self.connected:
+            await self._async_connect()
+
         output = await self.client.send_event_builder(event_builder)
 
-        return str(output.id.to_bech32())
+        return output.id.to_bech32()
 
     def delete_event(self, event_id: str, reason: Optional[str] = None) -> str:
         """
         Synchronous wrapper for async_delete_event
         """
-        return asyncio.run(self.async_delete_event(event_id, reason))
+        return _run_sync(self.async_delete_event(event_id, reason))
 
     async def async_get_agents(self, profile_filter: ProfileFilter) -> set[Profile]:
         """
@@ -258,7 +328,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_get_agents
         """
-        return asyncio.run(self.async_get_agents(profile_filter))
+        return _run_sync(self.async_get_agents(profile_filter))
 
     async def async_get_classified_listings(
         self, merchant: str, collection: Optional[Collection] = None
@@ -336,7 +406,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_get_classified_listings
         """
-        return asyncio.run(self.async_get_classified_listings(merchant, collection))
+        return _run_sync(self.async_get_classified_listings(merchant, collection))
 
     async def async_get_collections(
         self, merchant: Optional[str] = None
@@ -398,7 +468,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_get_collections
         """
-        return asyncio.run(self.async_get_collections(merchant))
+        return _run_sync(self.async_get_collections(merchant))
 
     async def async_get_merchants(
         self, profile_filter: Optional[ProfileFilter] = None
@@ -465,36 +535,25 @@ class NostrClient:
         # profiles that have published at least one stall
 
         try:
-            # Now async_get_stalls returns List[Stall] directly
-            stalls = await self.async_get_stalls()
-
-            # Get unique merchant public keys from stalls
-            merchant_keys = set()
-            for stall in stalls:
-                # We need to query events to get the actual author info
-                # Use a filter to get the merchant's profile info
-                stall_filter = Filter().kind(Kind(30017)).identifier(stall.id)
-                stall_events = await self.client.fetch_events_from(
-                    urls=self._get_relay_urls(),
-                    filter=stall_filter,
-                    timeout=timedelta(seconds=2),
-                )
-
-                # Skip if no events found
-                if stall_events.len() == 0:
-                    continue
-
-                for event in stall_events.to_vec():
-                    merchant_keys.add(event.author().to_hex())
+            # The stall events carry their authors, so a single query finds
+            # every merchant instead of one more round-trip per stall
+            merchant_keys = {
+                event.author().to_hex()
+                for event, _ in await self._async_get_stall_events()
+            }
 
-            # Now fetch the profiles for these merchants
-            for key in merchant_keys:
-                try:
-                    profile = await self.async_get_profile(key)
-                    merchants.add(profile)
-                except (ValueError, RuntimeError):
+            # Now fetch the profiles for these merchants concurrently
+            profiles = await asyncio.gather(
+                *[self.async_get_profile(key) for key in merchant_keys],
+                return_exceptions=True,
+            )
+            for profile in profiles:
+                if isinstance(profile, (ValueError, RuntimeError)):
                     # Skip profiles that can't be retrieved
                     continue
+                if isinstance(profile, BaseException):
+                    raise profile
+                merchants.add(profile)
 
             return merchants
 
@@ -507,7 +566,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_get_merchants
         """
-        return asyncio.run(self.async_get_merchants(profile_filter))
+        return _run_sync(self.async_get_merchants(profile_filter))
 
     async def async_get_merchants_in_marketplace(
         self,
@@ -565,13 +624,17 @@ class NostrClient:
             content = json.loads(event.content())
             if content.get("name") == marketplace_name:
                 merchants = content.get("merchants", [])
-                for merchant in merchants:
-                    try:
-                        # public_key = PublicKey.parse(merchant)
-                        profile = await self.async_get_profile(merchant)
-                        merchants_dict[merchant] = profile
-                    except RuntimeError:
+                # fetch the merchant profiles concurrently
+                profiles = await asyncio.gather(
+                    *[self.async_get_profile(merchant) for merchant in merchants],
+                    return_exceptions=True,
+                )
+                for merchant, profile in zip(merchants, profiles):
+                    if isinstance(profile, RuntimeError):
                         continue
+                    if isinstance(profile, BaseException):
+                        raise profile
+                    merchants_dict[merchant] = profile
 
         return set(merchants_dict.values())
 
@@ -584,7 +647,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_get_merchants_in_marketplace
         """
-        return asyncio.run(
+        return _run_sync(
             self.async_get_merchants_in_marketplace(
                 marketplace_owner, marketplace_name, profile_filter
             )
@@ -623,7 +686,6 @@ class NostrClient:
             if not self.connected:
                 await self._async_connect()
 
-            # print(f"Retrieving products from seller: {seller}")
             events_filter = Filter().kind(Kind(30018)).author(merchant_key)
             if stall is not None:
                 coordinate_tag = Coordinate(
@@ -651,8 +713,7 @@ class NostrClient:
             else:
                 seller_public_key = ""
             hashtags = tags.hashtags()
-            for hashtag in hashtags:
-                NostrClient.logger.debug("Logger Hashtag: %s", hashtag)
+            NostrClient.logger.debug("Logger Hashtags: %s", hashtags)
             product_data = ProductData(
                 id=content.get("id"),
                 stall_id=content.get("stall_id"),
@@ -678,7 +739,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_get_products
         """
-        return asyncio.run(self.async_get_products(merchant, stall))
+        return _run_sync(self.async_get_products(merchant, stall))
 
     async def async_get_profile(self, public_key: Optional[str] = None) -> Profile:
         """
@@ -729,7 +790,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_get_profile
         """
-        return asyncio.run(self.async_get_profile(public_key))
+        return _run_sync(self.async_get_profile(public_key))
 
     async def async_get_stalls(self, merchant: Optional[str] = None) -> List[Stall]:
         """
@@ -745,7 +806,26 @@ class NostrClient:
         Raises:
             RuntimeError: if the stalls can't be retrieved
         """
-        stalls = []
+        return [stall for _, stall in await self._async_get_stall_events(merchant)]
+
+    async def _async_get_stall_events(
+        self, merchant: Optional[str] = None
+    ) -> List[Tuple[Event, Stall]]:
+        """
+        Retrieve the stall events from a relay together with their parsed stalls.
+        The events are kept so callers can read the author without querying the
+        relay again for each stall.
+
+        Args:
+            merchant: Optional PublicKey of the merchant to retrieve the stalls for
+
+        Returns:
+            List[Tuple[Event, Stall]]: list of stall events and their stalls
+
+        Raises:
+            RuntimeError: if the merchant key is invalid
+        """
+        stalls: List[Tuple[Event, Stall]] = []
 
         if merchant is not None:
             try:
@@ -792,7 +872,7 @@ class NostrClient:
                 stall = Stall.from_json(content)
                 # Only add valid stalls with an ID
                 if stall.id != "unknown":
-                    stalls.append(stall)
+                    stalls.append((event, stall))
             except Exception as e:
                 self.logger.warning("Failed to parse stall data: %s", e)
                 continue
@@ -809,7 +889,7 @@ class NostrClient:
         Returns:
             List[Stall]: list of stalls
         """
-        return asyncio.run(self.async_get_stalls(merchant))
+        return _run_sync(self.async_get_stalls(merchant))
 
     async def async_publish_note(self, text: str) -> str:
         """
@@ -826,14 +906,17 @@ class NostrClient:
         """
         event_builder = EventBuilder.text_note(text)
         # event_id_obj = await self._async_publish_event(event_builder)
+        if not self.connected:
+            await self._async_connect()
+
         output = await self.client.send_event_builder(event_builder)
-        return str(output.id.to_bech32())
+        return output.id.to_bech32()
 
     def publish_note(self, text: str) -> str:
         """
         Synchronous wrapper for async_publish_note
         """
-        return asyncio.run(self.async_publish_note(text))
+        return _run_sync(self.async_publish_note(text))
 
     async def async_receive_message(self, timeout: Optional[int] = 15) -> str:
         """
@@ -872,171 +955,22 @@ class NostrClient:
             message_filter = (
                 Filter()
                 .kinds([Kind(4), Kind(1059)])  # DM and wrapped events
-                .pubkey(self.keys.public_key())
+                .pubkey(self._public_key)
                 .limit(0)  # Only get new messages
             )
 
-            self.logger.debug(
-                "Creating subscription with filter: kinds=[4,1059], pubkey=%s",
-                self.keys.public_key().to_bech32(),
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Creating subscription with filter: kinds=[4,1059], pubkey=%s",
+                    self._public_key.to_bech32(),
+                )
 
             # Create subscription
             subscription = await self.client.subscribe(message_filter, None)
             self.logger.debug("Subscription created: %s", subscription.id)
 
-            # Create a notification handler
-            class SingleMessageHandler(HandleNotification):
-                def __init__(self, nostr_client, future):
-                    super().__init__()
-                    self.nostr_client = nostr_client
-                    self.future = future
-                    self.received_eose = False
-
-                async def handle_msg(self, relay_url: str, msg: RelayMessage) -> None:
-                    # Use class-level logger
-                    NostrClient.logger.debug("Handle_msg from %s: %s", relay_url, msg)
-
-                    msg_enum = msg.as_enum()
-
-                    # Handle end of stored events
-                    if msg_enum.is_end_of_stored_events():
-                        NostrClient.logger.debug(
-                            "Received EOSE from %s, now waiting for real-time events",
-                            relay_url,
-                        )
-                        self.received_eose = True
-                        return
-
-                    # We only care about event messages
-                    if not msg_enum.is_event_msg():
-                        return
-
-                    event = msg_enum.event
-                    NostrClient.logger.debug(
-                        "Received event kind %s from %s",
-                        event.kind(),
-                        event.author().to_bech32(),
-                    )
-
-                    # Process based on event kind
-                    if event.kind() == Kind(4):
-                        NostrClient.logger.debug("Processing DM")
-                        try:
-                            content = (
-                                await self.nostr_client.nostr_signer.nip04_decrypt(
-                                    event.author(), event.content()
-                                )
-                            )
-                            NostrClient.logger.debug("Decrypted content: %s", content)
-                            if not self.future.done():
-                                self.future.set_result(
-                                    {
-                                        "type": "kind:4",
-                                        "sender": event.author().to_bech32(),
-                                        "content": content,
-                                    }
-                                )
-                        except Exception as e:
-                            NostrClient.logger.error("Failed to decrypt message: %s", e)
-
-                    elif event.kind() == Kind(1059):
-                        NostrClient.logger.debug("Processing gift-wrapped message")
-                        try:
-                            unwrapped = await self.nostr_client.client.unwrap_gift_wrap(
-                                event
-                            )
-                            rumor = unwrapped.rumor()
-                            kind_str = f"kind:{rumor.kind().as_u16()}"
-
-                            sender = "unknown"
-                            if hasattr(rumor, "author") and callable(
-                                getattr(rumor, "author")
-                            ):
-                                author = rumor.author()
-                                if author:
-                                    sender = author.to_bech32()
-
-                            NostrClient.logger.debug(
-                                "Unwrapped content: %s", rumor.content()
-                            )
-                            if not self.future.done():
-                                self.future.set_result(
-                                    {
-                                        "type": kind_str,
-                                        "sender": sender,
-                                        "content": rumor.content(),
-                                    }
-                                )
-                        except Exception as e:
-                            NostrClient.logger.error("Failed to unwrap gift: %s", e)
-
-                async def handle(
-                    self, relay_url: str, subscription_id: str, event: Event
-                ) -> None:
-                    NostrClient.logger.debug(
-                        "Handle from %s, subscription %s, event %s",
-                        relay_url,
-                        subscription_id,
-                        event.id(),
-                    )
-
-                    # Process based on event kind
-                    if event.kind() == Kind(4):
-                        NostrClient.logger.debug("Processing DM in handle")
-                        try:
-                            content = (
-                                await self.nostr_client.nostr_signer.nip04_decrypt(
-                                    event.author(), event.content()
-                                )
-                            )
-                            NostrClient.logger.debug("Decrypted content: %s", content)
-                            if not self.future.done():
-                                self.future.set_result(
-                                    {
-                                        "type": "kind:4",
-                                        "sender": event.author().to_bech32(),
-                                        "content": content,
-                                    }
-                                )
-                        except Exception as e:
-                            NostrClient.logger.error("Failed to decrypt message: %s", e)
-
-                    elif event.kind() == Kind(1059):
-                        NostrClient.logger.debug(
-                            "Processing gift-wrapped message in handle"
-                        )
-                        try:
-                            unwrapped = await self.nostr_client.client.unwrap_gift_wrap(
-                                event
-                            )
-                            rumor = unwrapped.rumor()
-                            kind_str = f"kind:{rumor.kind().as_u16()}"
-
-                            sender = "unknown"
-                            if hasattr(rumor, "author") and callable(
-                                getattr(rumor, "author")
-                            ):
-                                author = rumor.author()
-                                if author:
-                                    sender = author.to_bech32()
-
-                            NostrClient.logger.debug(
-                                "Unwrapped content: %s", rumor.content()
-                            )
-                            if not self.future.done():
-                                self.future.set_result(
-                                    {
-                                        "type": kind_str,
-                                        "sender": sender,
-                                        "content": rumor.content(),
-                                    }
-                                )
-                        except Exception as e:
-                            NostrClient.logger.error("Failed to unwrap gift: %s", e)
-
             # Create handler and notification task
-            handler = SingleMessageHandler(self, message_received)
+            handler = _SingleMessageHandler(self, message_received)
 
             try:
                 # Start notification handling
@@ -1081,7 +1015,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_receive_message
         """
-        return asyncio.run(self.async_receive_message(timeout))
+        return _run_sync(self.async_receive_message(timeout))
 
     async def async_send_message(self, kind: str, key: str, message: str) -> str:
         """
@@ -1121,19 +1055,19 @@ class NostrClient:
                     [Tag.public_key(public_key)]
                 )
                 output = await self.client.send_event_builder(builder)
-                self.logger.debug(
-                    "async_send_message: event id: %s", output.id.to_bech32()
-                )
             else:
                 self.logger.error("Invalid message kind: %s", kind)
                 raise RuntimeError(f"Invalid message kind: {kind}")
 
             # Check if any relay accepted the message
             if len(output.success) > 0:
-                self.logger.info(
-                    "Message sent to %s: %s", public_key.to_bech32(), message
-                )
-                return str(output.id.to_bech32())
+                event_id = output.id.to_bech32()
+                self.logger.debug("async_send_message: event id: %s", event_id)
+                # Message content may be private, keep it out of INFO logs
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info("Message sent to %s", public_key.to_bech32())
+                self.logger.debug("Message content: %s", message)
+                return event_id
 
             # No relay received the message
             self.logger.error(
@@ -1148,7 +1082,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_send_message
         """
-        return asyncio.run(self.async_send_message(kind, key, message))
+        return _run_sync(self.async_send_message(kind, key, message))
 
     async def async_set_product(self, product: Product) -> str:
         """
@@ -1166,20 +1100,16 @@ class NostrClient:
         if self.profile is None:
             raise RuntimeError("Profile not initialized. Call create() first.")
 
-        coordinate_tag = Coordinate(
-            Kind(30017),
-            PublicKey.parse(self.profile.get_public_key()),
-            product.stall_id,
-        )
+        public_key = PublicKey.parse(self.profile.get_public_key())
+        coordinate_tag = Coordinate(Kind(30017), public_key, product.stall_id)
 
         # EventBuilder.product_data() has a bug with tag handling.
         # We use the function to create the content field and discard the eventbuilder
         bad_event_builder = EventBuilder.product_data(product.to_product_data())
 
-        # create an event from bad_event_builder to extract the content -
-        # not broadcasted
-        bad_event = await self.client.sign_event_builder(bad_event_builder)
-        content = bad_event.content()
+        # build an unsigned event from bad_event_builder to extract the content -
+        # not signed nor broadcasted
+        content = bad_event_builder.build(public_key).content()
 
         event_tags: List[Tag] = []
         for category in product.categories:
@@ -1196,8 +1126,10 @@ class NostrClient:
         good_event_builder = EventBuilder(Kind(30018), content).tags(event_tags)
 
         try:
+            if not self.connected:
+                await self._async_connect()
             output = await self.client.send_event_builder(good_event_builder)
-            return str(output.id.to_bech32())
+            return output.id.to_bech32()
         except Exception as e:
             NostrClient.logger.error(
                 "Unable to publish product %s: %s", product.name, e
@@ -1208,7 +1140,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_set_product
         """
-        return asyncio.run(self.async_set_product(product))
+        return _run_sync(self.async_set_product(product))
 
     async def async_set_profile(self, profile: Profile) -> str:
         """
@@ -1229,7 +1161,7 @@ class NostrClient:
         """
         NostrClient.logger.debug("Setting profile: %s", profile)
         # Validate public key ownership or delegation
-        client_pubkey = self.keys.public_key().to_hex()
+        client_pubkey = self._public_key.to_hex()
         profile_pubkey = profile.get_public_key(KeyEncoding.HEX)
 
         # Check if profile belongs to client
@@ -1379,8 +1311,6 @@ class NostrClient:
             ]
             # Try to decode geohash to get latitude and longitude
             try:
-                import pygeohash as pgh
-
                 lat, lon = pgh.decode(geohash)
                 geo_tags.append(
                     Tag.custom(
@@ -1400,11 +1330,6 @@ class NostrClient:
                         ],
                     )
                 )
-            except ImportError:
-                # pygeohash not available, skip lat/lon encoding
-                NostrClient.logger.debug(
-                    "pygeohash library not available. Skipping latitude/longitude encoding."
-                )
             except Exception as e:
                 # Failed to decode geohash, skip lat/lon encoding
                 NostrClient.logger.warning(
@@ -1420,7 +1345,7 @@ class NostrClient:
         try:
             # event_id_obj = await self._async_publish_event(event_builder)
             output = await self.client.send_event_builder(event_builder)
-            return str(output.id.to_hex())
+            return output.id.to_hex()
         except RuntimeError as e:
             raise RuntimeError(f"Failed to publish profile: {e}") from e
 
@@ -1428,7 +1353,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_set_profile
         """
-        return asyncio.run(self.async_set_profile(profile))
+        return _run_sync(self.async_set_profile(profile))
 
     async def async_set_stall(self, stall: Stall) -> str:
         """
@@ -1454,14 +1379,17 @@ class NostrClient:
             ]
         )
         # event_id_obj = await self._async_publish_event(event_builder)
+        if not self.connected:
+            await self._async_connect()
+
         output = await self.client.send_event_builder(event_builder)
-        return str(output.id.to_bech32())
+        return output.id.to_bech32()
 
     def set_stall(self, stall: Stall) -> str:
         """
         Synchronous wrapper for async_set_stall
         """
-        return asyncio.run(self.async_set_stall(stall))
+        return _run_sync(self.async_set_stall(stall))
 
     async def async_subscribe_to_messages(self) -> str:
         """
@@ -1480,7 +1408,7 @@ class NostrClient:
         """
         Synchronous wrapper for async_subscribe_to_messages
         """
-        return asyncio.run(self.async_subscribe_to_messages())
+        return _run_sync(self.async_subscribe_to_messages())
 
     async def async_nip96_upload(
         self,
@@ -1591,7 +1519,7 @@ class NostrClient:
         Returns:
             str: URL of the uploaded file
         """
-        return asyncio.run(
+        return _run_sync(
             self.async_nip96_upload(
                 server_url=server_url,
                 file_data=file_data,
@@ -1638,13 +1566,22 @@ class NostrClient:
         Raises:
             RuntimeError: if the relay(s) can't be connected to
         """
-        if not self.connected:
+        if self.connected:
+            return
+
+        async with self._connect_lock:
+            # Another coroutine may have connected while we waited for the lock
+            if self.connected:
+                return
             try:
-                # Add all relays to the client
-                for relay in self.relays:
-                    relay_url = RelayUrl.parse(relay)
-                    await self.client.add_relay(relay_url)
-                    NostrClient.logger.info("Relay %s successfully added.", relay)
+                # Add all relays to the client concurrently
+                await asyncio.gather(
+                    *[
+                        self.client.add_relay(relay_url)
+                        for relay_url in self._get_relay_urls()
+                    ]
+                )
+                NostrClient.logger.info("Relays %s successfully added.", self.relays)
 
                 # Connect to all relays
                 await self.client.connect()
@@ -1792,3 +1729,82 @@ def generate_keys(env_var: str, env_path: Path) -> NostrKeys:
             f.write("\n")
 
     return nostr_keys
+
+
+class _SingleMessageHandler(HandleNotification):
+    """
+    Notification handler used by NostrClient.async_receive_message().
+    Resolves a future with the first direct message or gift-wrapped
+    message received.
+    """
+
+    def __init__(self, nostr_client: "NostrClient", future: asyncio.Future) -> None:
+        super().__init__()
+        self.nostr_client = nostr_client
+        self.future = future
+        self.received_eose = False
+
+    async def handle_msg(self, relay_url: str, msg: RelayMessage) -> None:
+        # Events are also delivered to handle(); processing them here too
+        # would decrypt every message twice
+        msg_enum = msg.as_enum()
+        if msg_enum.is_end_of_stored_events():
+            NostrClient.logger.debug(
+                "Received EOSE from %s, now waiting for real-time events",
+                relay_url,
+            )
+            self.received_eose = True
+
+    async def handle(self, relay_url: str, subscription_id: str, event: Event) -> None:
+        NostrClient.logger.debug(
+            "Handle from %s, subscription %s, event %s",
+            relay_url,
+            subscription_id,
+            event.id(),
+        )
+        if self.future.done():
+            return
+
+        # Process based on event kind
+        if event.kind() == Kind(4):
+            NostrClient.logger.debug("Processing DM")
+            try:
+                content = await self.nostr_client.nostr_signer.nip04_decrypt(
+                    event.author(), event.content()
+                )
+                NostrClient.logger.debug("Decrypted content: %s", content)
+                if not self.future.done():
+                    self.future.set_result(
+                        {
+                            "type": "kind:4",
+                            "sender": event.author().to_bech32(),
+                            "content": content,
+                        }
+                    )
+            except Exception as e:
+                NostrClient.logger.error("Failed to decrypt message: %s", e)
+
+        elif event.kind() == Kind(1059):
+            NostrClient.logger.debug("Processing gift-wrapped message")
+            try:
+                unwrapped = await self.nostr_client.client.unwrap_gift_wrap(event)
+                rumor = unwrapped.rumor()
+                kind_str = f"kind:{rumor.kind().as_u16()}"
+
+                sender = "unknown"
+                if hasattr(rumor, "author") and callable(getattr(rumor, "author")):
+                    author = rumor.author()
+                    if author:
+                        sender = author.to_bech32()
+
+                NostrClient.logger.debug("Unwrapped content: %s", rumor.content())
+                if not self.future.done():
+                    self.future.set_result(
+                        {
+                            "type": kind_str,
+                            "sender": sender,
+                            "content": rumor.content(),
+                        }
+                    )
+            except Exception as e:
+                NostrClient.logger.error("Failed to unwrap gift: %s", e)
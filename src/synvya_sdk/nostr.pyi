@@ -8,9 +8,10 @@ for classes, functions, and variables used within the Nostr module.
 Note: This is a type stub file and does not contain any executable code.
 """
 
+import asyncio
 from logging import Logger
 from pathlib import Path
-from typing import ClassVar, Dict, List, Optional, Union
+from typing import Any, ClassVar, Coroutine, Dict, List, Optional, Tuple, TypeVar, Union
 
 from nostr_sdk import (  # type: ignore
     Client,
@@ -38,6 +39,10 @@ from .models import (
     Stall,
 )
 
+T = TypeVar("T")
+
+def _run_sync(coro: Coroutine[Any, Any, T]) -> T: ...
+
 class NostrClient:
     """
     NostrClient implements the set of Nostr utilities required for higher level functions
@@ -47,6 +52,7 @@ class NostrClient:
     logger: ClassVar[Logger]
     relays: List[str]
     keys: Keys
+    _public_key: PublicKey
     nostr_signer: NostrSigner
     client: Client
     connected: bool
@@ -156,7 +162,21 @@ class NostrClient:
 
     # Internal methods
     async def _async_connect(self) -> None: ...
+    async def _async_get_stall_events(
+        self, merchant: Optional[str] = None
+    ) -> List[Tuple[Event, Stall]]: ...
     def get_public_key(self, encoding: KeyEncoding = KeyEncoding.BECH32) -> str: ...
 
 def generate_keys(env_var: str, env_path: Optional[Path] = None) -> NostrKeys: ...
 def verify_signature(message: str, signature: str, public_key: str) -> bool: ...
+
+class _SingleMessageHandler(HandleNotification):
+    nostr_client: NostrClient
+    future: asyncio.Future
+    received_eose: bool
+
+    def __init__(self, nostr_client: NostrClient, future: asyncio.Future) -> None: ...
+    async def handle_msg(self, relay_url: str, msg: RelayMessage) -> None: ...
+    async def handle(
+        self, relay_url: str, subscription_id: str, event: Event
+    ) -> None: ...
@@ -2,13 +2,14 @@
 This module contains tests for the BuyerTools class.
 """
 
+import asyncio
 import json
 from typing import List, cast
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
-from synvya_sdk import Product, Profile, Stall
+from synvya_sdk import KeyEncoding, NostrKeys, Product, Profile, ProfileFilter, Stall
 from synvya_sdk.agno import BuyerTools
 
 
@@ -87,3 +88,104 @@ async def test_get_products(
     assert len(result_data) > 0
     assert isinstance(result_data[0], dict)
     assert "name" in result_data[0]
+
+
+@pytest.mark.asyncio
+async def test_set_profile_refreshes_get_profile(
+    buyer_tools: BuyerTools,
+    buyer_profile: Profile,
+    buyer_about: str,
+) -> None:
+    """Test that get_profile reflects a profile set after a previous call"""
+    # Type assertion to help mypy
+    assert buyer_tools._nostr_client is not None
+
+    assert buyer_about not in buyer_tools.get_profile()
+
+    async_set_profile = cast(AsyncMock, buyer_tools._nostr_client.async_set_profile)
+    async_set_profile.return_value = "event_id"
+    result = json.loads(await buyer_tools.async_set_profile(buyer_profile))
+    assert result["status"] == "success"
+    async_set_profile.assert_awaited_once_with(buyer_profile)
+    assert json.loads(buyer_tools.get_profile())["about"] == buyer_about
+
+
+def test_merchants_not_shared_between_instances(
+    buyer_tools: BuyerTools,
+    mock_knowledge_base: Mock,
+    buyer_keys: NostrKeys,
+    merchant_profile: Profile,
+) -> None:
+    """Test that creating another BuyerTools does not reset existing merchants"""
+    other = BuyerTools(
+        mock_knowledge_base,
+        "wss://relay.example.com",
+        buyer_keys.get_private_key(KeyEncoding.BECH32),
+        _from_create=True,
+    )
+    assert other.merchants == set()
+    assert buyer_tools.merchants == {merchant_profile}
+
+
+@pytest.mark.asyncio
+async def test_get_merchants_stores_each_profile(
+    buyer_tools: BuyerTools,
+    merchant_profile: Profile,
+    buyer_profile: Profile,
+) -> None:
+    """Test that every downloaded merchant is upserted under its own hash"""
+    # Type assertion to help mypy
+    assert buyer_tools._nostr_client is not None
+
+    async_get_merchants = cast(AsyncMock, buyer_tools._nostr_client.async_get_merchants)
+    async_get_merchants.return_value = {merchant_profile, buyer_profile}
+
+    vector_db = Mock()
+    vector_db.async_upsert = AsyncMock()
+    vector_db.content_hash_exists = Mock(return_value=False)
+    buyer_tools.knowledge_base = Mock(vector_db=vector_db)
+
+    result = json.loads(await buyer_tools.async_get_merchants())
+    assert result == {"status": "success", "count": 2}
+    assert vector_db.async_upsert.await_count == 2
+    content_hashes = {call.args[0] for call in vector_db.async_upsert.await_args_list}
+    assert len(content_hashes) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_merchants_report_their_own_count(
+    buyer_tools: BuyerTools,
+    merchant_profile: Profile,
+    buyer_profile: Profile,
+) -> None:
+    """Test that overlapping merchant fetches each count their own results"""
+    # Type assertion to help mypy
+    assert buyer_tools._nostr_client is not None
+
+    async def get_merchants(profile_filter: ProfileFilter) -> set[Profile]:
+        if profile_filter.label == "restaurant":
+            return {merchant_profile, buyer_profile}
+        # arrives while the restaurants are still being stored
+        await asyncio.sleep(0.01)
+        return {merchant_profile}
+
+    async def upsert(*args: object) -> None:
+        await asyncio.sleep(0.02)
+
+    cast(AsyncMock, buyer_tools._nostr_client.async_get_merchants).side_effect = (
+        get_merchants
+    )
+    vector_db = Mock()
+    vector_db.async_upsert = AsyncMock(side_effect=upsert)
+    vector_db.content_hash_exists = Mock(return_value=False)
+    buyer_tools.knowledge_base = Mock(vector_db=vector_db)
+
+    results = await asyncio.gather(
+        *[
+            buyer_tools.async_get_merchants(
+                {"namespace": "com.synvya.merchant", "label": label}
+            )
+            for label in ("restaurant", "retail")
+        ]
+    )
+    assert [json.loads(r)["count"] for r in results] == [2, 1]
@@ -18,10 +18,12 @@ def test_keys_fixture() -> NostrKeys:
 
 @pytest.fixture(scope="function", name="mock_vector_db")
 def mock_vector_db_fixture() -> Mock:
-    """Fixture providing a mocked VectorDb"""
+    """Fixture providing a mocked, empty VectorDb"""
     mock_db = Mock()
     mock_db.async_upsert = AsyncMock()
     mock_db.upsert = Mock()
+    mock_db.content_hash_exists = Mock(return_value=False)
+    mock_db.delete_by_content_id = Mock()
     return mock_db
 
 
@@ -254,3 +256,48 @@ async def test_store_profile_in_kb_without_labels_or_external_identities(
             assert not filters["labels"]
         if "external_identities" in filters:
             assert not filters["external_identities"]
+
+
+@pytest.mark.asyncio
+async def test_store_profile_in_kb_skips_unchanged_profile(
+    mock_knowledge_base_with_vector_db: Mock,
+    mock_vector_db: Mock,
+    test_keys: NostrKeys,
+) -> None:
+    """Test that a profile already stored with the same content is not re-embedded"""
+    from unittest.mock import patch
+
+    profile = Profile(public_key=test_keys.get_public_key(KeyEncoding.HEX))
+    profile.set_name("Test Merchant")
+
+    with patch("synvya_sdk.NostrClient.create") as mock_create:
+        mock_client = Mock()
+        mock_client.async_get_profile = AsyncMock()
+        mock_client.async_get_profile.return_value = profile
+        mock_create.return_value = mock_client
+
+        buyer_tools = await BuyerTools.create(
+            mock_knowledge_base_with_vector_db,
+            ["wss://relay.example.com"],
+            test_keys.get_private_key(KeyEncoding.HEX),
+        )
+
+        # First download: not in the vector db yet
+        await buyer_tools._store_profile_in_kb(profile)
+        stored_hash = mock_vector_db.async_upsert.call_args[0][0]
+        mock_vector_db.delete_by_content_id.assert_called_once_with(
+            profile.get_public_key(KeyEncoding.HEX)
+        )
+
+        # Same profile again: already stored, nothing to embed
+        mock_vector_db.content_hash_exists.side_effect = lambda h: h == stored_hash
+        await buyer_tools._store_profile_in_kb(profile)
+        assert mock_vector_db.async_upsert.call_count == 1
+        assert mock_vector_db.delete_by_content_id.call_count == 1
+
+        # Changed profile: the old version is replaced
+        profile.set_about("Now open on Sundays")
+        await buyer_tools._store_profile_in_kb(profile)
+        assert mock_vector_db.async_upsert.call_count == 2
+        assert mock_vector_db.async_upsert.call_args[0][0] != stored_hash
+        assert mock_vector_db.delete_by_content_id.call_count == 2
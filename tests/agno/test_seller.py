@@ -10,7 +10,7 @@ from unittest.mock import AsyncMock
 import pytest
 
 from synvya_sdk import Product, Profile, Stall
-from synvya_sdk.agno import MerchantTools
+from synvya_sdk.agno import MerchantTools, seller
 
 
 @pytest.mark.asyncio
@@ -172,6 +172,7 @@ async def test_profile_operations(
     """Test profile-related operations"""
     # No need to mock get_profile since we're not testing it directly
     profile_data = json.loads(merchant_tools.get_profile())
+    assert isinstance(profile_data, dict)
     assert "name" in profile_data
     assert "about" in profile_data
 
@@ -187,3 +188,189 @@ async def test_profile_operations(
 
     result = await merchant_tools.async_set_profile(merchant_profile)
     assert isinstance(result, str)
+    assert merchant_tools.profile is merchant_profile
+    assert merchant_about in merchant_tools.get_profile()
+
+
+@pytest.mark.asyncio
+async def test_publish_all_products_partial_failure(
+    merchant_tools: MerchantTools, product_event_ids: List[str]
+) -> None:
+    """Test that one failed product does not abort the concurrent batch"""
+    # Type assertion to help mypy
+    assert merchant_tools.nostr_client is not None
+
+    # Get the mock client
+    mock_client = merchant_tools.nostr_client
+
+    async_set_product = cast(AsyncMock, mock_client.async_set_product)
+    async_set_product.side_effect = [
+        product_event_ids[0],
+        RuntimeError("relay rejected event"),
+        product_event_ids[2],
+    ]
+
+    results = json.loads(await merchant_tools.async_publish_products())
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert results[1]["message"] == "relay rejected event"
+    assert merchant_tools.product_db[0][1] == product_event_ids[0]
+    assert merchant_tools.product_db[1][1] is None
+
+
+@pytest.mark.asyncio
+async def test_publish_unknown_product(merchant_tools: MerchantTools) -> None:
+    """Test publishing a product name that is not in the product db"""
+    result = json.loads(await merchant_tools.async_publish_product("no-such-product"))
+    assert result["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_publish_product_updates_event_id(
+    merchant_tools: MerchantTools,
+    product_event_ids: List[str],
+    products: List[Product],
+) -> None:
+    """Test that publishing a product records its event id in place"""
+    # Type assertion to help mypy
+    assert merchant_tools.nostr_client is not None
+
+    async_set_product = cast(AsyncMock, merchant_tools.nostr_client.async_set_product)
+    async_set_product.return_value = product_event_ids[1]
+
+    await merchant_tools.async_publish_product(products[1].name)
+    assert len(merchant_tools.product_db) == len(products)
+    assert merchant_tools.product_db[1] == (products[1], product_event_ids[1])
+
+
+@pytest.mark.asyncio
+async def test_get_products_cache_refreshed_on_set(
+    merchant_tools: MerchantTools, products: List[Product]
+) -> None:
+    """Test that get_products reflects a new product db after set_products"""
+    assert len(json.loads(merchant_tools.get_products())) == len(products)
+
+    await merchant_tools.async_set_products(products[:1])
+    products_output = json.loads(merchant_tools.get_products())
+    assert len(products_output) == 1
+    assert products_output[0]["name"] == products[0].name
+
+
+@pytest.mark.asyncio
+async def test_remove_stalls_removes_their_products(
+    merchant_tools: MerchantTools, stalls: List[Stall], products: List[Product]
+) -> None:
+    """Test that removing a stall also removes every product in it"""
+    # Type assertion to help mypy
+    assert merchant_tools.nostr_client is not None
+
+    async_delete_event = cast(AsyncMock, merchant_tools.nostr_client.async_delete_event)
+    async_delete_event.return_value = "deleted"
+
+    results = json.loads(await merchant_tools.async_remove_stalls([stalls[0]]))
+    in_stall = [p for p in products if p.stall_id == stalls[0].id]
+    assert len(results) == len(in_stall) + 1
+    assert all(r["status"] == "success" for r in results)
+    assert all(p.stall_id != stalls[0].id for p, _ in merchant_tools.product_db)
+    assert all(s.id != stalls[0].id for s, _ in merchant_tools.stall_db)
+
+
+@pytest.mark.asyncio
+async def test_publish_products_subset_matches_by_id(
+    merchant_tools: MerchantTools,
+    product_event_ids: List[str],
+    products: List[Product],
+) -> None:
+    """Test that a product subset is matched by id, not object identity"""
+    # Type assertion to help mypy
+    assert merchant_tools.nostr_client is not None
+
+    async_set_product = cast(AsyncMock, merchant_tools.nostr_client.async_set_product)
+    async_set_product.return_value = product_event_ids[0]
+
+    subset = [Product.from_json(products[2].to_json())]
+    results = json.loads(await merchant_tools.async_publish_products(products=subset))
+    assert len(results) == 1
+    assert results[0]["product_name"] == products[2].name
+
+
+@pytest.mark.asyncio
+async def test_send_payment_request_accepts_decoded_order(
+    merchant_tools: MerchantTools,
+) -> None:
+    """Test that an order handed over as a dict is not parsed again"""
+    # Type assertion to help mypy
+    assert merchant_tools.nostr_client is not None
+
+    async_send_message = cast(AsyncMock, merchant_tools.nostr_client.async_send_message)
+    async_send_message.return_value = "sent"
+
+    order = {"id": "order-1", "type": 0, "items": []}
+    result = json.loads(
+        await merchant_tools.async_send_payment_request(
+            "buyer", order, "kind:14", "URL", "https://example.com/pay"
+        )
+    )
+    assert result == "sent"
+    assert "order-1" in async_send_message.call_args.args[2]
+
+
+@pytest.mark.asyncio
+async def test_publish_all_products_raises_unexpected_errors(
+    merchant_tools: MerchantTools, product_event_ids: List[str]
+) -> None:
+    """Test that a non-RuntimeError from one publish is raised, not reported"""
+    # Type assertion to help mypy
+    assert merchant_tools.nostr_client is not None
+
+    async_set_product = cast(AsyncMock, merchant_tools.nostr_client.async_set_product)
+    async_set_product.side_effect = [
+        product_event_ids[0],
+        ValueError("malformed product"),
+        product_event_ids[2],
+    ]
+
+    with pytest.raises(ValueError, match="malformed product"):
+        await merchant_tools.async_publish_products()
+    # the other publishes still ran to completion
+    assert merchant_tools.product_db[2][1] == product_event_ids[2]
+
+
+@pytest.mark.asyncio
+async def test_publish_records_event_id_by_product_id(
+    merchant_tools: MerchantTools,
+    product_event_ids: List[str],
+    products: List[Product],
+) -> None:
+    """Test that a publish finishing after the db changed updates the right entry"""
+    # Type assertion to help mypy
+    assert merchant_tools.nostr_client is not None
+
+    async def set_product(product: Product) -> str:
+        # the product db is reordered while the event is being published
+        merchant_tools.product_db = [(p, None) for p in reversed(products)]
+        return product_event_ids[0]
+
+    async_set_product = cast(AsyncMock, merchant_tools.nostr_client.async_set_product)
+    async_set_product.side_effect = set_product
+
+    await merchant_tools.async_publish_product(products[0].name)
+    assert merchant_tools.product_db[-1] == (products[0], product_event_ids[0])
+    assert all(event_id is None for _, event_id in merchant_tools.product_db[:-1])
+
+
+def test_dumps_fallback_matches_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that tool output doesn't depend on whether orjson is installed"""
+    payload = {"status": "success", "names": ["Café", 'say "hi"'], "count": 2}
+    with_orjson = seller._dumps(payload)
+    monkeypatch.setattr(seller, "HAS_ORJSON", False)
+    assert seller._dumps(payload) == with_orjson
+
+
+def test_assigning_profile_refreshes_get_profile(
+    merchant_tools: MerchantTools, merchant_profile: Profile, merchant_about: str
+) -> None:
+    """Test that get_profile doesn't serve a cached copy of a replaced profile"""
+    assert merchant_about not in merchant_tools.get_profile()
+
+    merchant_tools.profile = merchant_profile
+    assert merchant_about in merchant_tools.get_profile()
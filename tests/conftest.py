@@ -534,6 +534,7 @@ async def buyer_tools_fixture(
     mock_client.async_get_merchants_in_marketplace = AsyncMock()
     mock_client.async_get_products = AsyncMock()
     mock_client.async_get_stalls = AsyncMock()
+    mock_client.async_set_profile = AsyncMock()
     mock_client.async_send_message = AsyncMock()
     mock_client.async_receive_message = AsyncMock()
 
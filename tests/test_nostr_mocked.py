@@ -3,14 +3,16 @@ Module to perform mocked tests on the NostrClient class.
 Used for regular CI/CD testing without connecting to a real Nostr relay.
 """
 
+import asyncio
 from typing import Generator, List
-from unittest.mock import patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-from nostr_sdk import EventId
+from nostr_sdk import EventId, Kind
 
 from synvya_sdk import KeyEncoding, NostrClient, NostrKeys, Product, Profile, Stall
 from synvya_sdk.models import ClassifiedListing
+from synvya_sdk.nostr import _run_sync, _SingleMessageHandler
 
 
 # used in test_nostr_mocked.py
@@ -161,3 +163,96 @@ class TestNostrClientMocked:
         assert profile.get_name() == merchant_profile.get_name()
         assert profile.get_picture() == merchant_profile.get_picture()
         assert profile.get_website() == merchant_profile.get_website()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_connect_adds_relays_once(
+        self, relay: str, merchant_keys: NostrKeys
+    ) -> None:
+        """Test that concurrent callers share a single relay connection"""
+        client = NostrClient(
+            relay, merchant_keys.get_private_key(KeyEncoding.BECH32), _from_create=True
+        )
+        client.client = Mock()
+        client.client.add_relay = AsyncMock()
+        client.client.connect = AsyncMock()
+
+        with patch("synvya_sdk.nostr.asyncio.sleep", new=AsyncMock()):
+            await asyncio.gather(*[client._async_connect() for _ in range(5)])
+
+        assert client.connected
+        assert client.client.add_relay.await_count == 1
+        assert client.client.connect.await_count == 1
+
+    def test_profile_public_key_encodings(self, merchant_keys: NostrKeys) -> None:
+        """Test that Profile accepts either key encoding and returns both"""
+        hex_key = merchant_keys.get_public_key(KeyEncoding.HEX)
+        bech32_key = merchant_keys.get_public_key(KeyEncoding.BECH32)
+
+        from_hex = Profile(hex_key)
+        from_bech32 = Profile(bech32_key)
+        assert from_hex.public_key == from_bech32.public_key == hex_key
+        assert from_hex.get_public_key(KeyEncoding.BECH32) == bech32_key
+        assert from_bech32.get_public_key(KeyEncoding.HEX) == hex_key
+
+    @pytest.mark.asyncio
+    async def test_connect_adds_every_relay(self, merchant_keys: NostrKeys) -> None:
+        """Test that all configured relays are added before connecting"""
+        relays = ["wss://relay.one", "wss://relay.two", "wss://relay.three"]
+        client = NostrClient(
+            relays, merchant_keys.get_private_key(KeyEncoding.BECH32), _from_create=True
+        )
+        client.client = Mock()
+        client.client.add_relay = AsyncMock()
+        client.client.connect = AsyncMock()
+
+        with patch("synvya_sdk.nostr.asyncio.sleep", new=AsyncMock()):
+            await client._async_connect()
+
+        assert client.client.add_relay.await_count == len(relays)
+        client.client.connect.assert_awaited_once()
+
+    def test_sync_wrappers_share_one_event_loop(self) -> None:
+        """Test that synchronous calls reuse the same background event loop"""
+
+        async def running_loop() -> asyncio.AbstractEventLoop:
+            return asyncio.get_running_loop()
+
+        first = _run_sync(running_loop())
+        assert first is _run_sync(running_loop())
+        assert first.is_running()
+
+    @pytest.mark.asyncio
+    async def test_message_handler_decrypts_each_event_once(self) -> None:
+        """Test that a direct message is only decrypted from the event callback"""
+        client = Mock()
+        client.nostr_signer.nip04_decrypt = AsyncMock(return_value="hello")
+        event = Mock()
+        event.kind.return_value = Kind(4)
+        event.author.return_value.to_bech32.return_value = "npub1sender"
+        msg = Mock()
+        msg.as_enum.return_value.is_end_of_stored_events.return_value = False
+        msg.as_enum.return_value.is_event_msg.return_value = True
+        msg.as_enum.return_value.event = event
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        handler = _SingleMessageHandler(client, future)
+        await handler.handle_msg("wss://relay.one", msg)
+        await handler.handle("wss://relay.one", "sub", event)
+        await handler.handle("wss://relay.two", "sub", event)
+
+        client.nostr_signer.nip04_decrypt.assert_awaited_once()
+        assert future.result() == {
+            "type": "kind:4",
+            "sender": "npub1sender",
+            "content": "hello",
+        }
+
+    @pytest.mark.asyncio
+    async def test_sync_wrappers_reject_running_loop(self) -> None:
+        """Test that synchronous calls fail fast inside a running event loop"""
+
+        async def noop() -> None:
+            return None
+
+        with pytest.raises(RuntimeError, match="async_"):
+            _run_sync(noop())